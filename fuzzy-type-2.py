@@ -303,6 +303,17 @@ plt.show()
 max_epoch = 50
 threshold_stable = 0.1  # cm (batas stabil)
 lamp_position = lamp_distance  # posisi awal lampu
+max_period = 8  # periode osilasi terpanjang yang dideteksi
+cycle_tol = 1e-3  # cm, toleransi posisi "kembali ke titik yang sama"
+visited = [lamp_position]
+
+# Indeks anteseden tiap rule, dihitung sekali (bukan pencocokan substring tiap epoch)
+height_keys = ["Semai", "Vegetatif", "Generatif", "Produktif"]
+distance_keys = ["Sangat Dekat", "Dekat", "Sedang", "Jauh", "Sangat Jauh"]
+antecedents = []
+for desc, _, _, _ in rules:
+    h, d = desc.split(" & ")
+    antecedents.append((height_keys.index(h), distance_keys.index(d)))
 
 print("\n=== SIMULASI GERAK LAMPU SAMPAI STABIL ===")
 
@@ -325,28 +336,13 @@ for epoch in range(max_epoch):
     aggregated_upper[:] = 0
     aggregated_lower[:] = 0
 
-    for desc, action, _, mf in rules:
-        # Hitung ulang strength dari kondisi terbaru
-        if "Semai" in desc:
-            hμ = μ_semai
-        elif "Vegetatif" in desc:
-            hμ = μ_vegetatif
-        elif "Generatif" in desc:
-            hμ = μ_generatif
-        else:
-            hμ = μ_produktif
-
-        if "Sangat Dekat" in desc:
-            dμ = μ_sangat_dekat
-        elif "Dekat" in desc:
-            dμ = μ_dekat
-        elif "Sedang" in desc:
-            dμ = μ_sedang
-        elif "Sangat Jauh" in desc:
-            dμ = μ_sangat_jauh
-        else:
-            dμ = μ_jauh
+    μ_h = [μ_semai, μ_vegetatif, μ_generatif, μ_produktif]
+    μ_d = [μ_sangat_dekat, μ_dekat, μ_sedang, μ_jauh, μ_sangat_jauh]
 
+    for (hi, di), (_, _, _, mf) in zip(antecedents, rules):
+        # Hitung ulang strength dari kondisi terbaru
+        hμ = μ_h[hi]
+        dμ = μ_d[di]
         strength = min(hμ, dμ)
 
         aggregated_upper = np.fmax(aggregated_upper, np.fmin(strength, mf[0]))
@@ -372,5 +368,25 @@ for epoch in range(max_epoch):
         break
 
     lamp_position = new_position
+
+    # Cek keluar domain / osilasi: hentikan begitu nasibnya sudah jelas
+    if not x_distance[0] <= lamp_position <= x_distance[-1]:
+        print("\n⚠️ Lampu keluar domain jarak, sistem divergen.")
+        break
+    # osilasi hanya jika lampu kembali ke posisi k epoch lalu dan sempat
+    # bergerak bolak-balik; merayap pelan satu arah bukan osilasi
+    period = 0
+    for k in range(2, min(max_period, len(visited)) + 1):
+        steps = np.diff(visited[-k:] + [lamp_position])
+        if (
+            abs(lamp_position - visited[-k]) <= cycle_tol
+            and steps.min() < 0 < steps.max()
+        ):
+            period = k
+            break
+    if period:
+        print(f"\n🔁 Lampu berosilasi dengan periode {period}, simulasi dihentikan.")
+        break
+    visited.append(lamp_position)
 else:
     print("\n⚠️ Maksimum epoch tercapai, sistem belum sepenuhnya stabil.")
@@ -1,7 +1,14 @@
+import hashlib
+import io
+import time
+
 import streamlit as st
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 
+rerun_start = time.perf_counter()
+
 # CONFIG
 st.set_page_config(page_title="Fuzzy Type-2 Grow Light", layout="wide")
 st.title("🌱 Fuzzy Type-2 Grow Light Controller (Streamlit)")
@@ -28,34 +35,50 @@ def defuzz(x, upper, lower):
     return (c_upper + c_lower) / 2
 
 
-# Domain
-x_height = np.linspace(0, 110, 300)
-x_distance = np.linspace(0, 100, 300)
-x_output = np.linspace(-50, 50, 300)
-
-# Membership Functions
-mf_height = {
-    "Semai": gaussian_t2(x_height, 8, 4, 2),
-    "Vegetatif": gaussian_t2(x_height, 30, 6, 3),
-    "Generatif": gaussian_t2(x_height, 60, 6, 3),
-    "Produktif": gaussian_t2(x_height, 90, 6, 3),
+# Parameter MF: (mean, sigma_upper, sigma_lower)
+MF_PARAMS = {
+    "height": {
+        "Semai": (8, 4, 2),
+        "Vegetatif": (30, 6, 3),
+        "Generatif": (60, 6, 3),
+        "Produktif": (90, 6, 3),
+    },
+    "distance": {
+        "Sangat Dekat": (5, 3, 1.5),
+        "Dekat": (15, 5, 3),
+        "Sedang": (30, 6, 3),
+        "Jauh": (50, 7, 4),
+        "Sangat Jauh": (80, 7, 4),
+    },
+    "output": {
+        "Turun Banyak": (-30, 6, 3),
+        "Turun Sedikit": (-15, 5, 2),
+        "Diam": (0, 4, 2),
+        "Naik Sedikit": (15, 5, 2),
+        "Naik Banyak": (30, 6, 3),
+    },
 }
+MF_HASH = hashlib.sha1(repr(MF_PARAMS).encode()).hexdigest()
 
-mf_distance = {
-    "Sangat Dekat": gaussian_t2(x_distance, 5, 3, 1.5),
-    "Dekat": gaussian_t2(x_distance, 15, 5, 3),
-    "Sedang": gaussian_t2(x_distance, 30, 6, 3),
-    "Jauh": gaussian_t2(x_distance, 50, 7, 4),
-    "Sangat Jauh": gaussian_t2(x_distance, 80, 7, 4),
-}
 
-mf_output = {
-    "Turun Banyak": gaussian_t2(x_output, -30, 6, 3),
-    "Turun Sedikit": gaussian_t2(x_output, -15, 5, 2),
-    "Diam": gaussian_t2(x_output, 0, 4, 2),
-    "Naik Sedikit": gaussian_t2(x_output, 15, 5, 2),
-    "Naik Banyak": gaussian_t2(x_output, 30, 6, 3),
-}
+# Domain + Membership Functions (dibangun sekali per proses)
+@st.cache_resource
+def build_mf(mf_hash):
+    x = {
+        "height": np.linspace(0, 110, 300),
+        "distance": np.linspace(0, 100, 300),
+        "output": np.linspace(-50, 50, 300),
+    }
+    mf = {
+        var: {name: gaussian_t2(x[var], *p) for name, p in sets.items()}
+        for var, sets in MF_PARAMS.items()
+    }
+    return x, mf
+
+
+x, mf = build_mf(MF_HASH)
+x_height, x_distance, x_output = x["height"], x["distance"], x["output"]
+mf_height, mf_distance, mf_output = mf["height"], mf["distance"], mf["output"]
 
 # Sidebar Input
 st.sidebar.header("🔧 Input Sensor")
@@ -64,14 +87,16 @@ plant_height = st.sidebar.slider("Tinggi Tanaman (cm)", 0.0, 110.0, 30.0)
 lamp_distance = st.sidebar.slider("Jarak Lampu (cm)", 0.0, 100.0, 40.0)
 max_epoch = st.sidebar.slider("Batas Epoch Simulasi", 5, 50, 15)
 stabil_threshold = st.sidebar.slider("Threshold Stabil (cm)", 0.01, 1.0, 0.05)
+live_render = st.sidebar.checkbox("Tampilkan per epoch (live)", value=True)
+render_fps = st.sidebar.slider("Batas Redraw (fps)", 1, 60, 15)
 
 # Layout
 col1, col2 = st.columns(2)
 
-# PLOT Membership
-with col1:
-    st.subheader("📊 Membership Functions")
 
+# Gambar MF dirender sekali ke PNG, di-key dengan hash parameter MF
+@st.cache_data
+def render_mf_png(mf_hash):
     fig, axs = plt.subplots(3, 1, figsize=(7, 10))
 
     # Height
@@ -95,84 +120,84 @@ with col1:
     axs[2].legend()
     axs[2].grid(True)
 
-    st.pyplot(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data
+def fuzzify_inputs(plant_height, lamp_distance, mf_hash):
+    μ = {k: fuzzify(plant_height, x_height, v) for k, v in mf_height.items()}
+    μ.update({k: fuzzify(lamp_distance, x_distance, v) for k, v in mf_distance.items()})
+    return μ
+
+
+# PLOT Membership
+with col1:
+    st.subheader("📊 Membership Functions")
+    st.image(render_mf_png(MF_HASH))
 
 # FUZZIFIKASI
 with col2:
     st.subheader("🔎 Fuzzifikasi")
 
-    μ = {
-        "Semai": fuzzify(plant_height, x_height, mf_height["Semai"]),
-        "Vegetatif": fuzzify(plant_height, x_height, mf_height["Vegetatif"]),
-        "Generatif": fuzzify(plant_height, x_height, mf_height["Generatif"]),
-        "Produktif": fuzzify(plant_height, x_height, mf_height["Produktif"]),
-        "Sangat Dekat": fuzzify(lamp_distance, x_distance, mf_distance["Sangat Dekat"]),
-        "Dekat": fuzzify(lamp_distance, x_distance, mf_distance["Dekat"]),
-        "Sedang": fuzzify(lamp_distance, x_distance, mf_distance["Sedang"]),
-        "Jauh": fuzzify(lamp_distance, x_distance, mf_distance["Jauh"]),
-        "Sangat Jauh": fuzzify(lamp_distance, x_distance, mf_distance["Sangat Jauh"]),
-    }
+    μ = fuzzify_inputs(plant_height, lamp_distance, MF_HASH)
 
     for k, v in μ.items():
         st.write(f"{k}: **{v:.3f}**")
 
 # INFERENSI + SIMULASI
-st.subheader("⚙️ Simulasi Kontrol Lampu")
-
-if st.button("Mulai Simulasi"):
+RULES = [
+    ("Semai", "Sangat Dekat", "Naik Sedikit"),
+    ("Semai", "Dekat", "Diam"),
+    ("Semai", "Sedang", "Turun Sedikit"),
+    ("Semai", "Jauh", "Turun Banyak"),
+    ("Semai", "Sangat Jauh", "Turun Banyak"),
+    ("Vegetatif", "Sangat Dekat", "Naik Banyak"),
+    ("Vegetatif", "Dekat", "Naik Sedikit"),
+    ("Vegetatif", "Sedang", "Diam"),
+    ("Vegetatif", "Jauh", "Turun Sedikit"),
+    ("Vegetatif", "Sangat Jauh", "Turun Banyak"),
+    ("Generatif", "Sangat Dekat", "Naik Banyak"),
+    ("Generatif", "Dekat", "Naik Sedikit"),
+    ("Generatif", "Sedang", "Diam"),
+    ("Generatif", "Jauh", "Turun Sedikit"),
+    ("Generatif", "Sangat Jauh", "Turun Sedikit"),
+    ("Produktif", "Sangat Dekat", "Naik Banyak"),
+    ("Produktif", "Dekat", "Naik Sedikit"),
+    ("Produktif", "Sedang", "Naik Sedikit"),
+    ("Produktif", "Jauh", "Diam"),
+    ("Produktif", "Sangat Jauh", "Diam"),
+]
+
+
+# Satu record per epoch, kolom sama dengan modules/telemetry.py
+HISTORY_DTYPE = np.dtype(
+    [
+        ("epoch", "<i4"),
+        ("distance", "<f8"),
+        ("move", "<f8"),
+        ("new_distance", "<f8"),
+        ("delta", "<f8"),
+    ]
+)
+
+
+def simulation_steps(plant_height, lamp_distance, max_epoch, stabil_threshold):
     current_distance = lamp_distance
-    history = []
 
-    placeholder = st.empty()
+    μ_h = {k: fuzzify(plant_height, x_height, v) for k, v in mf_height.items()}
 
     for epoch in range(max_epoch):
-
         μ_d = {
-            "Sangat Dekat": fuzzify(
-                current_distance, x_distance, mf_distance["Sangat Dekat"]
-            ),
-            "Dekat": fuzzify(current_distance, x_distance, mf_distance["Dekat"]),
-            "Sedang": fuzzify(current_distance, x_distance, mf_distance["Sedang"]),
-            "Jauh": fuzzify(current_distance, x_distance, mf_distance["Jauh"]),
-            "Sangat Jauh": fuzzify(
-                current_distance, x_distance, mf_distance["Sangat Jauh"]
-            ),
+            k: fuzzify(current_distance, x_distance, v) for k, v in mf_distance.items()
         }
 
-        μ_h = {
-            "Semai": fuzzify(plant_height, x_height, mf_height["Semai"]),
-            "Vegetatif": fuzzify(plant_height, x_height, mf_height["Vegetatif"]),
-            "Generatif": fuzzify(plant_height, x_height, mf_height["Generatif"]),
-            "Produktif": fuzzify(plant_height, x_height, mf_height["Produktif"]),
-        }
-
-        rules = [
-            ("Semai", "Sangat Dekat", "Naik Sedikit"),
-            ("Semai", "Dekat", "Diam"),
-            ("Semai", "Sedang", "Turun Sedikit"),
-            ("Semai", "Jauh", "Turun Banyak"),
-            ("Semai", "Sangat Jauh", "Turun Banyak"),
-            ("Vegetatif", "Sangat Dekat", "Naik Banyak"),
-            ("Vegetatif", "Dekat", "Naik Sedikit"),
-            ("Vegetatif", "Sedang", "Diam"),
-            ("Vegetatif", "Jauh", "Turun Sedikit"),
-            ("Vegetatif", "Sangat Jauh", "Turun Banyak"),
-            ("Generatif", "Sangat Dekat", "Naik Banyak"),
-            ("Generatif", "Dekat", "Naik Sedikit"),
-            ("Generatif", "Sedang", "Diam"),
-            ("Generatif", "Jauh", "Turun Sedikit"),
-            ("Generatif", "Sangat Jauh", "Turun Sedikit"),
-            ("Produktif", "Sangat Dekat", "Naik Banyak"),
-            ("Produktif", "Dekat", "Naik Sedikit"),
-            ("Produktif", "Sedang", "Naik Sedikit"),
-            ("Produktif", "Jauh", "Diam"),
-            ("Produktif", "Sangat Jauh", "Diam"),
-        ]
-
         aggregated_upper = np.zeros_like(x_output)
         aggregated_lower = np.zeros_like(x_output)
 
-        for h, d, out in rules:
+        for h, d, out in RULES:
             strength = min(μ_h[h], μ_d[d])
             out_u, out_l = mf_output[out]
             aggregated_upper = np.fmax(aggregated_upper, np.fmin(strength, out_u))
@@ -183,13 +208,87 @@ if st.button("Mulai Simulasi"):
         new_distance = current_distance + move
         delta = abs(new_distance - current_distance)
 
-        history.append((epoch + 1, current_distance, move, new_distance, delta))
+        yield epoch + 1, current_distance, move, new_distance, delta
 
         current_distance = new_distance
 
         if delta < stabil_threshold:
             break
 
+
+@st.cache_data
+def run_simulation(plant_height, lamp_distance, max_epoch, stabil_threshold, mf_hash):
+    history = np.zeros(max_epoch, dtype=HISTORY_DTYPE)
+    n = 0
+    for row in simulation_steps(
+        plant_height, lamp_distance, max_epoch, stabil_threshold
+    ):
+        history[n] = row
+        n += 1
+    return history[:n]
+
+
+TABLE_COLUMNS = {
+    "distance": "Jarak Awal (cm)",
+    "move": "Gerak Lampu (cm)",
+    "new_distance": "Jarak Baru (cm)",
+    "delta": "Delta",
+}
+
+
+def history_frame(rows):
+    df = pd.DataFrame(rows).set_index("epoch").rename(columns=TABLE_COLUMNS)
+    df.index.name = "Epoch"
+    return df
+
+
+def render_history(history, table, chart_d, chart_m, new=True):
+    # new=True: elemen baru dibuat; False: baris ditambahkan ke elemen yang ada
+    df = history_frame(history)
+    if new:
+        return (
+            table.dataframe(df.round(4)),
+            chart_d.line_chart(df[["Jarak Awal (cm)"]]),
+            chart_m.line_chart(df[["Gerak Lampu (cm)"]]),
+        )
+    table.add_rows(df.round(4))
+    chart_d.add_rows(df[["Jarak Awal (cm)"]])
+    chart_m.add_rows(df[["Gerak Lampu (cm)"]])
+    return table, chart_d, chart_m
+
+
+def stream_simulation(
+    slots, status, plant_height, lamp_distance, max_epoch, stabil_threshold
+):
+    # Epoch langsung tampil; redraw dibatasi ke render_fps, sisa baris di-flush
+    # sekaligus di akhir
+    history = np.zeros(max_epoch, dtype=HISTORY_DTYPE)
+    interval = 1.0 / render_fps
+    elements = None
+    n = flushed = 0
+    last_draw = -np.inf
+
+    for row in simulation_steps(
+        plant_height, lamp_distance, max_epoch, stabil_threshold
+    ):
+        history[n] = row
+        n += 1
+        now = time.perf_counter()
+        if now - last_draw >= interval:
+            status.write(f"Epoch {n} / {max_epoch}")
+            elements = render_history(
+                history[flushed:n], *(elements or slots), new=elements is None
+            )
+            flushed, last_draw = n, now
+
+    if n > flushed:
+        render_history(history[flushed:n], *(elements or slots), new=elements is None)
+    return history[:n]
+
+
+st.subheader("⚙️ Simulasi Kontrol Lampu")
+
+if st.button("Mulai Simulasi"):
     # ===============================
     # Tampilkan hasil
     # ===============================
@@ -197,45 +296,45 @@ if st.button("Mulai Simulasi"):
     st.write(f"#### Tinggi Tanaman: {plant_height} cm")
     st.write(f"#### Jarak Lampu Tanaman: {lamp_distance} cm")
 
-    st.table(
-        {
-            "Epoch": [h[0] for h in history],
-            "Jarak Awal (cm)": [round(h[1], 2) for h in history],
-            "Gerak Lampu (cm)": [round(h[2], 2) for h in history],
-            "Jarak Baru (cm)": [round(h[3], 2) for h in history],
-            "Delta": [round(h[4], 4) for h in history],
-        }
-    )
+    status = st.empty()
+    placeholder = st.empty()
 
-    # ===============================
-    # Grafik Terpisah
-    # ===============================
-    st.write("### 📊 Grafik Terpisah per Epoch")
-
-    epochs = [h[0] for h in history]
-    distance = [h[1] for h in history]
-    movement = [h[2] for h in history]
-
-    col1, col2 = st.columns(2)
-
-    # --- 2. Grafik Jarak Lampu ---
-    with col1:
-        st.write("#### 💡 Jarak Lampu")
-        fig_d, ax_d = plt.subplots(figsize=(4, 3))
-        ax_d.plot(epochs, distance, marker="s", color="green")
-        ax_d.set_xlabel("Epoch")
-        ax_d.set_ylabel("Jarak (cm)")
-        ax_d.set_title("Jarak Lampu")
-        ax_d.grid(True)
-        st.pyplot(fig_d)
-
-    # --- 3. Grafik Gerakan Lampu ---
-    with col2:
-        st.write("#### 🔼 Gerakan")
-        fig_m, ax_m = plt.subplots(figsize=(4, 3))
-        ax_m.plot(epochs, movement, marker="^")
-        ax_m.set_xlabel("Epoch")
-        ax_m.set_ylabel("Gerakan (cm)")
-        ax_m.set_title("Gerakan Lampu")
-        ax_m.grid(True)
-        st.pyplot(fig_m)
+    with placeholder.container():
+        table = st.empty()
+
+        # ===============================
+        # Grafik Terpisah
+        # ===============================
+        st.write("### 📊 Grafik Terpisah per Epoch")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("#### 💡 Jarak Lampu")
+            chart_d = st.empty()
+        with col2:
+            st.write("#### 🔼 Gerakan")
+            chart_m = st.empty()
+
+    slots = (table, chart_d, chart_m)
+    if live_render:
+        history = stream_simulation(
+            slots, status, plant_height, lamp_distance, max_epoch, stabil_threshold
+        )
+    else:
+        history = run_simulation(
+            plant_height, lamp_distance, max_epoch, stabil_threshold, MF_HASH
+        )
+        render_history(history, *slots)
+    status.write(f"Selesai dalam {len(history)} epoch")
+
+# ===============================
+# Panel waktu per rerun
+# ===============================
+rerun_ms = (time.perf_counter() - rerun_start) * 1000
+timings = st.session_state.setdefault("rerun_ms", [])
+timings.append(rerun_ms)
+
+with st.sidebar.expander("⏱️ Waktu Rerun", expanded=True):
+    st.write(f"Rerun pertama (tanpa cache): **{timings[0]:.1f} ms**")
+    st.write(f"Rerun ini: **{rerun_ms:.1f} ms**")
+    if len(timings) > 1:
+        st.write(f"Rerun sebelumnya: **{timings[-2]:.1f} ms**")
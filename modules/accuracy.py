@@ -0,0 +1,140 @@
+import time
+
+import numpy as np
+
+from domains import create_domains
+from membership import build_memberships, build_parametric_memberships
+from rules import build_rules, CompiledRuleBase
+from inference import infer_batch
+from fleet import simulate_fleet
+from analytic import infer_analytic
+
+STAGE_HEIGHTS = {"semai": 8, "vegetatif": 30, "generatif": 60, "produktif": 90}
+
+
+def _controller(resolution, dtype):
+    domains = create_domains(resolution, dtype)
+    mf = build_memberships(domains, lazy_inputs=True)
+    return domains, mf, CompiledRuleBase(build_rules(), mf)
+
+
+def _evaluate(controller, h, d, h0, d0, max_epoch, stable_th):
+    domains, mf, crb = controller
+    moves = infer_batch(h, d, domains, mf, crb)[2].astype(float)
+    final = simulate_fleet(
+        domains, mf, crb, h0, d0, max_epoch=max_epoch, stable_th=stable_th
+    )["final"].astype(float)
+    return moves, final
+
+
+def resolution_report(
+    resolutions=(100, 200, 300, 1000, 3000),
+    dtypes=("float64", "float32"),
+    reference=(10000, "float64"),
+    actuator_precision=0.1,
+    n=2000,
+    max_epoch=200,
+    stable_th=0.01,
+    seed=0,
+):
+    rng = np.random.default_rng(seed)
+    h = rng.uniform(0, 110, n)
+    d = rng.uniform(0, 100, n)
+    H0, D0 = np.meshgrid(
+        list(STAGE_HEIGHTS.values()), np.linspace(5, 95, 10), indexing="ij"
+    )
+    h0, d0 = H0.ravel(), D0.ravel()
+
+    ref = _evaluate(_controller(*reference), h, d, h0, d0, max_epoch, stable_th)
+
+    print(f"\n=== AKURASI vs REFERENSI {reference[0]} {reference[1]} ===")
+    print(
+        f"{'Resolusi':>8s} {'dtype':>8s} {'Memori MF':>10s} {'Move max':>9s} "
+        f"{'Move mean':>10s} {'Ekuil. max':>11s}  OK"
+    )
+
+    rows = []
+    for res in resolutions:
+        for dtype in dtypes:
+            controller = _controller(res, np.dtype(dtype))
+            moves, final = _evaluate(controller, h, d, h0, d0, max_epoch, stable_th)
+            move_err = np.abs(moves - ref[0])
+            eq_err = np.abs(final - ref[1])
+            row = {
+                "resolution": res,
+                "dtype": dtype,
+                "mf_bytes": controller[2].outputs.nbytes,
+                "move_max": float(move_err.max()),
+                "move_mean": float(move_err.mean()),
+                "equilibrium_max": float(eq_err.max()),
+            }
+            row["within_precision"] = (
+                row["move_max"] <= actuator_precision
+                and row["equilibrium_max"] <= actuator_precision
+            )
+            rows.append(row)
+            print(
+                f"{res:8d} {dtype:>8s} {row['mf_bytes'] / 1024:8.1f}KB "
+                f"{row['move_max']:9.4f} {row['move_mean']:10.4f} "
+                f"{row['equilibrium_max']:11.4f}  {'✅' if row['within_precision'] else '❌'}"
+            )
+
+    return rows
+
+
+def cheapest_within_precision(rows):
+    ok = [r for r in rows if r["within_precision"]]
+    return min(ok, key=lambda r: (r["mf_bytes"], r["resolution"])) if ok else None
+
+
+def _us_per_sample(fn, n, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best * 1e6 / n
+
+
+def analytic_report(resolutions=(100, 300, 1000, 3000, 10000, 30000), n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    h = rng.uniform(0, 110, n)
+    d = rng.uniform(0, 100, n)
+    rules = build_rules()
+    domains, params = create_domains(), build_parametric_memberships()
+    exact, cost = _us_per_sample(
+        lambda: infer_analytic(h, d, domains, params, rules), n
+    )
+
+    # the analytic result is exact but not free: the cost sits next to the error
+    print("\n=== ANALITIK vs SAMPLED ===")
+    print(f"{'analitik':>12s} | {cost:.1f} us/sampel")
+    rows = [{"resolution": None, "max": 0.0, "mean": 0.0, "us_per_sample": cost}]
+    for res in resolutions:
+        domains, mf, crb = _controller(res, np.float64)
+        sampled, cost = _us_per_sample(
+            lambda: infer_batch(h, d, domains, mf, crb)[2], n
+        )
+        err = np.abs(sampled - exact)
+        rows.append(
+            {
+                "resolution": res,
+                "max": float(err.max()),
+                "mean": float(err.mean()),
+                "us_per_sample": cost,
+            }
+        )
+        print(
+            f"{res:6d} titik | max: {err.max():.6f} | mean: {err.mean():.6f} "
+            f"| {cost:.1f} us/sampel"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    analytic_report()
+    best = cheapest_within_precision(resolution_report())
+    if best:
+        print(
+            f"\nTermurah dalam presisi aktuator: {best['resolution']} {best['dtype']}"
+        )
@@ -0,0 +1,155 @@
+import math
+
+import numpy as np
+
+from fuzzification import fuzzify_sets
+from rules import compile_rules
+
+_SQRT2 = math.sqrt(2.0)
+_SQRT_PI_2 = math.sqrt(math.pi / 2.0)
+
+
+# numpy has no erf; it is only evaluated where a run of Gaussian pieces
+# starts or ends, a handful of points per row
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def _pair_points(m, sg):
+    # g_i = g_j  <=>  (x - m_i) / sg_i = +-(x - m_j) / sg_j, for i < j; NaN
+    # where the sigmas are equal
+    i, j = np.triu_indices(m.size, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        points = np.concatenate(
+            [
+                (m[i] * sg[j] + m[j] * sg[i]) / (sg[i] + sg[j]),
+                (m[i] * sg[j] - m[j] * sg[i]) / (sg[j] - sg[i]),
+            ]
+        )
+    return points, np.concatenate([i, i]), np.concatenate([j, j])
+
+
+def _antiderivatives(x, m, sg):
+    # F = integral of g, G = integral of x * g, for g = exp(-(x - m)^2 / 2sg^2)
+    F = sg * _SQRT_PI_2 * _erf((x - m) / (sg * _SQRT2)).astype(float)
+    G = m * F - sg * sg * np.exp(-0.5 * ((x - m) / sg) ** 2)
+    return F, G
+
+
+def envelope_moments(strengths, means, sigmas, lo, hi, eps=1e-12):
+    # area and first moment of max_k min(s_k, g_k(x)) over [lo, hi] for every
+    # row of strengths (N, k). Every row has the same k^2-sized candidate set
+    # of breakpoints, so the whole batch is one fixed-shape array
+    s = np.asarray(strengths, dtype=float)
+    s = np.where(s > eps, s, 0.0)
+    m = np.asarray(means, dtype=float)
+    sg = np.asarray(sigmas, dtype=float)
+    n = s.shape[0]
+
+    # where an active consequent's Gaussian crosses an active clip level, and
+    # where two active Gaussians cross. Sets clipped at 0 never show in the
+    # envelope, so their crossings are dropped, as are points outside
+    # [lo, hi]; each row keeps its valid points first, sorted, and the batch
+    # is cut to the widest row
+    active = s > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.sqrt(-2.0 * np.log(s))
+    off = sg * w[:, :, None]  # (n, clip level j, Gaussian i)
+    # g_i = s_j only matters if piece i can rise above level j: s_i > s_j
+    above = (s[:, None, :] > s[:, :, None]) | np.eye(s.shape[1], dtype=bool)
+    both = (above & active[:, :, None] & active[:, None, :]).reshape(n, -1)
+    pair, pi, pj = _pair_points(m, sg)
+    points = np.concatenate(
+        [
+            (m - off).reshape(n, -1),
+            (m + off).reshape(n, -1),
+            np.broadcast_to(pair, (n, pair.size)),
+        ],
+        axis=1,
+    )
+    valid = np.concatenate([both, both, active[:, pi] & active[:, pj]], axis=1)
+    with np.errstate(invalid="ignore"):
+        valid &= (points > lo) & (points < hi)
+    points = np.sort(np.where(valid, points, np.inf), axis=1)
+    points = points[:, : valid.sum(axis=1).max()]
+    edges = np.full((n, 1), lo), np.full((n, 1), hi)
+    points = np.concatenate([edges[0], np.minimum(points, hi), edges[1]], axis=1)
+    a, b = points[:, :-1], points[:, 1:]
+
+    # one piece dominates between consecutive breakpoints
+    mid = (0.5 * (a + b))[..., None] - m
+    g = np.exp(np.square(mid, out=mid) * (-0.5 / sg**2))
+    piece = np.minimum(s[:, None, :], g).argmax(axis=2)
+    level = np.take_along_axis(s, piece, axis=1)
+    flat = np.take_along_axis(g, piece[..., None], axis=2)[..., 0] >= level
+
+    area = np.where(flat, level * (b - a), 0.0).sum(axis=1)
+    moment = np.where(flat, level * (b * b - a * a) / 2, 0.0).sum(axis=1)
+
+    # a run of intervals under the same Gaussian telescopes to F(end) - F(start)
+    key = np.where(flat, -1, piece)
+    change = key[:, 1:] != key[:, :-1]
+    edge = np.ones((n, 1), dtype=bool)
+    for mask, x, sign in (
+        (~flat & np.concatenate([edge, change], axis=1), a, -1.0),
+        (~flat & np.concatenate([change, edge], axis=1), b, 1.0),
+    ):
+        row, col = np.nonzero(mask)
+        j = piece[row, col]
+        F, G = _antiderivatives(x[row, col], m[j], sg[j])
+        area += sign * np.bincount(row, F, minlength=n)
+        moment += sign * np.bincount(row, G, minlength=n)
+    return area, moment
+
+
+def clipped_envelope_moments(strengths, means, sigmas, lo, hi, eps=1e-12):
+    area, moment = envelope_moments(
+        np.atleast_2d(strengths), means, sigmas, lo, hi, eps
+    )
+    return float(area[0]), float(moment[0])
+
+
+def _centroids(out_strength, output_params, lo, hi, reducer):
+    if reducer not in ("bmm", "nt"):
+        raise ValueError(
+            f"Analytic defuzzification supports 'bmm' and 'nt', not {reducer!r}"
+        )
+    means, sigma_upper, sigma_lower = np.asarray(output_params, dtype=float).T
+    au, mu = envelope_moments(out_strength, means, sigma_upper, lo, hi)
+    al, ml = envelope_moments(out_strength, means, sigma_lower, lo, hi)
+
+    if reducer == "nt":
+        total = au + al
+        return np.divide(mu + ml, total, out=np.zeros(total.shape), where=total > 0)
+    cu = np.divide(mu, au, out=np.zeros(au.shape), where=au > 0)
+    cl = np.divide(ml, al, out=np.zeros(al.shape), where=al > 0)
+    return (cu + cl) / 2
+
+
+def defuzz_analytic(out_strength, output_params, lo, hi, reducer="bmm"):
+    return float(
+        _centroids(np.atleast_2d(out_strength), output_params, lo, hi, reducer)[0]
+    )
+
+
+def infer_analytic(
+    heights, distances, domains, params, rules, reducer="bmm", chunk=4096
+):
+    # params: fully parametric MFs, e.g. build_parametric_memberships()
+    heights, distances = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(heights, dtype=float)),
+        np.atleast_1d(np.asarray(distances, dtype=float)),
+    )
+    crb = compile_rules(rules, params)
+    lo, hi = float(domains["output"][0]), float(domains["output"][-1])
+
+    μh = fuzzify_sets(heights, domains["height"], params["height"])
+    μd = fuzzify_sets(distances, domains["distance"], params["distance"])
+    out = crb.output_strengths(crb.strengths(μh, μd))
+
+    # chunked: the piece search holds (chunk, ~k^2, k) intermediates
+    return np.concatenate(
+        [
+            _centroids(out[i : i + chunk], crb.output_params, lo, hi, reducer)
+            for i in range(0, max(len(out), 1), chunk)
+        ]
+    )
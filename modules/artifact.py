@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from domains import create_domains
+from membership import GaussianT2, build_parametric_memberships
+from rules import build_rules, CompiledRuleBase
+from memo import fingerprint
+
+# layout: int64 header | JSON manifest | 64-byte aligned raw arrays.
+# The manifest lists every array's dtype, shape and offset into the data
+# section plus the sha256 of that section; loading maps the file once and
+# hands out views, so processes mapping the same file share its pages
+MAGIC = 0x31414C5254434C46  # "FLCTRLA1"
+VERSION = 1
+HEADER_WORDS = 8  # magic, version, manifest bytes, data offset, data bytes
+HEADER_BYTES = HEADER_WORDS * 8
+ALIGN = 64
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def save_artifact(path, domains, params, rules, surface=None, reducer="bmm"):
+    mf_out = {k: p(domains["output"]) for k, p in params["output"].items()}
+    crb = CompiledRuleBase(rules, {**params, "output": mf_out})
+    arrays = {
+        "domain_height": domains["height"],
+        "domain_distance": domains["distance"],
+        "domain_output": domains["output"],
+        "mf_height": np.array([m.params() for m in params["height"].values()]),
+        "mf_distance": np.array([m.params() for m in params["distance"].values()]),
+        "mf_output": np.array([m.params() for m in params["output"].values()]),
+        "outputs": crb.outputs,
+        "h_idx": crb.h_idx,
+        "d_idx": crb.d_idx,
+        "o_idx": crb.o_idx,
+        "rule_at": crb.rule_at,
+    }
+    if surface is not None:
+        arrays["surface"] = np.asarray(surface.table)
+
+    entries, offset = {}, 0
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        arrays[name] = a
+        entries[name] = {
+            "dtype": a.dtype.str,
+            "shape": list(a.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + a.nbytes)
+    data_bytes = offset
+
+    digest = hashlib.sha256()
+    data = bytearray(data_bytes)
+    for name, a in arrays.items():
+        start = entries[name]["offset"]
+        data[start : start + a.nbytes] = a.tobytes()
+    digest.update(data)
+
+    manifest = {
+        "version": VERSION,
+        "sha256": digest.hexdigest(),
+        "fingerprint": fingerprint(params, crb.rules),
+        "reducer": reducer,
+        "sets": {var: list(sets) for var, sets in params.items()},
+        "rules": [list(r) for r in crb.rules],
+        "surface_ranges": (
+            [
+                [float(surface.h0), float(surface.h1)],
+                [float(surface.d0), float(surface.d1)],
+            ]
+            if surface is not None
+            else None
+        ),
+        "surface_meta": surface.meta if surface is not None else None,
+        "arrays": entries,
+    }
+    blob = json.dumps(manifest).encode()
+    data_offset = _align(HEADER_BYTES + len(blob))
+
+    header = np.zeros(HEADER_WORDS, dtype="<i8")
+    header[:5] = [MAGIC, VERSION, len(blob), data_offset, data_bytes]
+
+    # write-then-rename: a reader never maps a half-written artifact
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header.tobytes())
+        f.write(blob)
+        f.write(b"\0" * (data_offset - HEADER_BYTES - len(blob)))
+        f.write(data)
+    os.replace(tmp, path)
+    return manifest
+
+
+def build_artifact(
+    path, params=None, rules=None, resolution=300, dtype=np.float64, **kwargs
+):
+    return save_artifact(
+        path,
+        create_domains(resolution, dtype),
+        params or build_parametric_memberships(),
+        rules or build_rules(),
+        **kwargs,
+    )
+
+
+def load_artifact(path, verify=False):
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    header = raw[:HEADER_BYTES].view("<i8")
+    if header[0] != MAGIC:
+        raise ValueError(f"{path} is not a controller artifact")
+    if header[1] != VERSION:
+        raise ValueError(
+            f"{path} has artifact version {int(header[1])}, expected {VERSION}"
+        )
+    n_manifest, data_offset, data_bytes = (int(v) for v in header[2:5])
+    manifest = json.loads(raw[HEADER_BYTES : HEADER_BYTES + n_manifest].tobytes())
+    data = raw[data_offset : data_offset + data_bytes]
+
+    if verify:
+        if hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+            raise ValueError(f"{path} content hash does not match its manifest")
+
+    arrays = {}
+    for name, e in manifest["arrays"].items():
+        dtype = np.dtype(e["dtype"])
+        n = int(np.prod(e["shape"])) * dtype.itemsize
+        arrays[name] = (
+            data[e["offset"] : e["offset"] + n].view(dtype).reshape(e["shape"])
+        )
+    return manifest, arrays
+
+
+def artifact_controller(path, verify=False):
+    # domains, mf and CompiledRuleBase as build_memberships(lazy_inputs=True)
+    # would give them, but backed by the mapped file
+    manifest, a = load_artifact(path, verify)
+    sets = manifest["sets"]
+    domains = {
+        "height": a["domain_height"],
+        "distance": a["domain_distance"],
+        "output": a["domain_output"],
+    }
+    params = {
+        var: {
+            name: GaussianT2(*(float(v) for v in p))
+            for name, p in zip(sets[var], a[f"mf_{var}"])
+        }
+        for var in ("height", "distance", "output")
+    }
+    outputs = a["outputs"]
+    mf = {
+        "height": params["height"],
+        "distance": params["distance"],
+        "output": {
+            name: (outputs[k, 0], outputs[k, 1])
+            for k, name in enumerate(sets["output"])
+        },
+    }
+    # the rule base indexes straight into the mapped arrays: no name lookup
+    # and no stacked copy of the consequents
+    crb = CompiledRuleBase.from_arrays(
+        sets,
+        a["h_idx"],
+        a["d_idx"],
+        a["o_idx"],
+        outputs=outputs,
+        rule_at=a["rule_at"],
+    )
+
+    surface = None
+    if "surface" in a:
+        from surface import ControlSurface
+
+        surface = ControlSurface(
+            a["surface"], *manifest["surface_ranges"], manifest.get("surface_meta")
+        )
+    return {
+        "manifest": manifest,
+        "domains": domains,
+        "params": params,
+        "mf": mf,
+        "rules": crb,
+        "surface": surface,
+    }
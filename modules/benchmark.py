@@ -0,0 +1,397 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from domains import create_domains
+from membership import build_memberships
+from rules import build_rules, CompiledRuleBase
+from inference import infer, infer_batch, infer_sparse, rule_evals_per_call
+from defuzzification import defuzz
+from fuzzification import fuzzify
+from simulation import simulate
+from controller import FuzzyController
+from type_reduction import REDUCERS, ekm
+
+
+def _throughput(fn, n, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+def bench_infer_batch(sizes=(1, 10, 100, 1000), seed=0):
+    domains = create_domains()
+    mf = build_memberships(domains)
+    rules = build_rules()
+    crb = CompiledRuleBase(rules, mf)
+    xo = domains["output"]
+    rng = np.random.default_rng(seed)
+
+    print("\n=== BENCHMARK INFERENSI (sampel/detik) ===")
+    for n in sizes:
+        h = rng.uniform(0, 110, n)
+        d = rng.uniform(0, 100, n)
+
+        def scalar():
+            for hi, di in zip(h, d):
+                defuzz(xo, *infer(hi, di, domains, mf, rules))
+
+        def batch():
+            infer_batch(h, d, domains, mf, crb)
+
+        s = _throughput(scalar, n)
+        b = _throughput(batch, n)
+        print(f"N={n:>6d} | Skalar: {s:>12.0f} | Batch: {b:>12.0f} | x{b / s:.1f}")
+
+
+def bench_reducers(n=1000, seed=0):
+    domains = create_domains()
+    mf = build_memberships(domains)
+    rules = build_rules()
+    xo = domains["output"]
+    rng = np.random.default_rng(seed)
+
+    h = rng.uniform(0, 110, n)
+    d = rng.uniform(0, 100, n)
+    agg_u, agg_l, _ = infer_batch(h, d, domains, mf, rules)
+    ref = REDUCERS["km"](xo, agg_u, agg_l)
+
+    print(f"\n=== BENCHMARK TYPE REDUCER (N={n}) ===")
+    for name, reduce in REDUCERS.items():
+        rate = _throughput(lambda: reduce(xo, agg_u, agg_l), n)
+        dev = np.abs(reduce(xo, agg_u, agg_l) - ref)
+        print(
+            f"{name:>4s} | {1e6 / rate:8.3f} us/sampel | "
+            f"max dev vs KM: {dev.max():.4f} | mean: {dev.mean():.4f}"
+        )
+
+    _, it_l, it_r = ekm(xo, agg_u, agg_l, return_iterations=True)
+    print(f"EKM iterasi rata-rata: kiri {it_l.mean():.2f} | kanan {it_r.mean():.2f}")
+
+
+def bench_sparse(n=500, eps=1e-6, seed=0):
+    domains = create_domains()
+    mf = build_memberships(domains, lazy_inputs=True)
+    rules = build_rules()
+    crb = CompiledRuleBase(rules, mf)
+    rng = np.random.default_rng(seed)
+    h = rng.uniform(0, 110, n)
+    d = rng.uniform(0, 100, n)
+    stats = {}
+
+    def dense():
+        for hi, di in zip(h, d):
+            infer(hi, di, domains, mf, rules)
+
+    def sparse():
+        for hi, di in zip(h, d):
+            infer_sparse(hi, di, domains, mf, crb, eps, stats)
+
+    dr = _throughput(dense, n)
+    sr = _throughput(sparse, n)
+    print(f"\n=== BENCHMARK AKTIVASI SPARSE (eps={eps:g}) ===")
+    print(
+        f"Rule dievaluasi/panggilan: {rule_evals_per_call(stats):.2f} dari {len(crb)}"
+    )
+    print(f"Dense: {dr:.0f} sampel/detik | Sparse: {sr:.0f} sampel/detik")
+
+
+def _min_peak_per_call(fn, calls):
+    # smallest tracemalloc peak over the calls, relative to what was held
+    # before each: an allocation made on every call shows up in all of them,
+    # a one-off (lazy import, first-call cache) only in some
+    tracemalloc.start()
+    for _ in range(10):
+        fn()
+    best = None
+    for _ in range(calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - before
+        best = peak if best is None else min(best, peak)
+    tracemalloc.stop()
+    return best
+
+
+def _retained_blocks(fn, calls, files):
+    # blocks allocated from `files` that are still alive after the calls
+    filters = [tracemalloc.Filter(True, f) for f in files]
+    tracemalloc.start()
+    for _ in range(10):
+        fn()
+    before = tracemalloc.take_snapshot().filter_traces(filters)
+    for _ in range(calls):
+        fn()
+    after = tracemalloc.take_snapshot().filter_traces(filters)
+    tracemalloc.stop()
+    return sum(max(d.count_diff, 0) for d in after.compare_to(before, "lineno"))
+
+
+def _noop(h, d):
+    return 0.0
+
+
+def bench_controller_alloc(
+    calls=1000, points=((30.0, 40.0), (5.0, 90.0), (95.0, 10.0))
+):
+    import controller as controller_module
+
+    domains = create_domains()
+    mf = build_memberships(domains)
+    rules = build_rules()
+    xo = domains["output"]
+    controller = FuzzyController()
+
+    def loop(fn):
+        def run():
+            for h, d in points:
+                fn(h, d)
+
+        return run
+
+    # the harness's own loop is subtracted; what is left must be smaller than
+    # the cheapest array numpy can hand out, a view with no data of its own
+    harness = _min_peak_per_call(loop(_noop), calls)
+    probe = np.empty(2)
+    array_bytes = _min_peak_per_call(lambda: probe[:1], calls)
+    files = [controller_module.__file__, os.path.join("*", "numpy", "*")]
+
+    print(f"\n=== ALOKASI MEMORI PER PANGGILAN ({calls} panggilan) ===")
+    ok = True
+    for name, fn, gated in (
+        (
+            "infer+defuzz",
+            lambda h, d: defuzz(xo, *infer(h, d, domains, mf, rules)),
+            False,
+        ),
+        ("Controller.infer", controller.infer, True),
+        ("Controller.move", controller.move, True),
+    ):
+        extra = _min_peak_per_call(loop(fn), calls) - harness
+        kept = _retained_blocks(loop(fn), calls, files)
+        line = (
+            f"{name:<16s} | puncak/panggilan: {extra:6d} B | blok tertahan: {kept:4d}"
+        )
+        if gated:
+            passed = extra < array_bytes and kept == 0
+            ok &= passed
+            line += " | ✅" if passed else " | ❌"
+        print(line)
+
+    print(
+        f"✅ FuzzyController tanpa alokasi array (< {array_bytes} B per panggilan)"
+        if ok
+        else f"❌ FuzzyController mengalokasikan array (>= {array_bytes} B per panggilan)"
+    )
+    return ok
+
+
+def bench_startup(budget_ms=400, argv=("infer", "30", "40"), forbidden=("matplotlib",)):
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", cli, *argv],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    import_us = 0
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        import_us += int(self_us)
+        modules.append(name.strip())
+    leaked = sorted({m for m in modules if m.split(".")[0] in forbidden})
+
+    ok = wall_ms <= budget_ms and not leaked
+    print(f"\n=== STARTUP cli.py {' '.join(argv)} ===")
+    print(
+        f"Import: {import_us / 1000:.1f} ms | Total: {wall_ms:.1f} ms | Budget: {budget_ms} ms"
+    )
+    if leaked:
+        print(f"⚠️ Modul terlarang diimpor: {', '.join(leaked)}")
+    print("✅ Dalam budget" if ok else "❌ Melebihi budget")
+    return ok
+
+
+RESOLUTIONS = (100, 300, 1000, 3000, 10000)
+BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _time_per_call(fn, min_time=0.2, repeat=3):
+    # grow the loop count until one measurement takes min_time, keep the best
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed))
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / loops)
+    return best
+
+
+def machine_metadata():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(
+    resolutions=RESOLUTIONS,
+    batch_sizes=BATCH_SIZES,
+    max_work=2e8,
+    chunk_elements=2e6,
+    min_time=0.2,
+    seed=0,
+):
+    rules = build_rules()
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    def record(key, seconds, n=1):
+        results[key] = {"seconds": seconds, "per_sample": seconds / n, "n": n}
+        print(f"{key:<40s} {seconds * 1e3:10.3f} ms  {n / seconds:14.0f} sampel/detik")
+
+    for res in resolutions:
+        domains = create_domains(res)
+        mf = build_memberships(domains)
+        crb = CompiledRuleBase(rules, mf)
+        xh, xo = domains["height"], domains["output"]
+        agg_u, agg_l = infer(30.0, 40.0, domains, mf, rules)
+
+        record(
+            f"fuzzify/res={res}",
+            _time_per_call(
+                lambda: fuzzify(30.0, xh, mf["height"]["vegetatif"]), min_time
+            ),
+        )
+        record(
+            f"infer/res={res}",
+            _time_per_call(lambda: infer(30.0, 40.0, domains, mf, rules), min_time),
+        )
+        record(
+            f"defuzz/res={res}",
+            _time_per_call(lambda: defuzz(xo, agg_u, agg_l), min_time),
+        )
+
+        def run_simulate():
+            with contextlib.redirect_stdout(io.StringIO()):
+                simulate(domains, mf, rules, 30.0, 80.0, max_epoch=50, stable_th=0.1)
+
+        record(f"simulate/res={res}", _time_per_call(run_simulate, min_time))
+
+        # (chunk, n_outputs, 2, res) intermediate bounds the chunk size
+        chunk = max(1, int(chunk_elements // (len(crb.output_sets) * 2 * res)))
+        for n in batch_sizes:
+            n = int(n)
+            if n * res > max_work:
+                continue
+            h = rng.uniform(0, 110, n)
+            d = rng.uniform(0, 100, n)
+
+            def run_batch():
+                for i in range(0, n, chunk):
+                    infer_batch(h[i : i + chunk], d[i : i + chunk], domains, mf, crb)
+
+            record(
+                f"infer_batch/res={res}/batch={n}",
+                _time_per_call(run_batch, min_time, repeat=1 if n >= 1e5 else 3),
+                n,
+            )
+
+    return {"metadata": machine_metadata(), "results": results}
+
+
+def compare(current, baseline, threshold=0.10):
+    regressions = []
+    base = baseline["results"]
+    for key, entry in current["results"].items():
+        if key not in base:
+            continue
+        ratio = entry["seconds"] / base[key]["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline fuzzy type-2")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--resolutions", type=int, nargs="+", default=RESOLUTIONS)
+    parser.add_argument("--batch-sizes", type=float, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--max-work", type=float, default=2e8)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument(
+        "--legacy", action="store_true", help="jalankan juga bench_* interaktif"
+    )
+    parser.add_argument(
+        "--startup-budget-ms",
+        type=float,
+        default=None,
+        help="hanya cek waktu startup CLI headless terhadap budget",
+    )
+    args = parser.parse_args(argv)
+
+    if args.startup_budget_ms is not None:
+        return 0 if bench_startup(args.startup_budget_ms) else 1
+
+    if args.legacy:
+        bench_infer_batch()
+        bench_reducers()
+        bench_sparse()
+
+    alloc_ok = bench_controller_alloc()
+    report = run_suite(
+        args.resolutions, args.batch_sizes, args.max_work, min_time=args.min_time
+    )
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for key, ratio in regressions:
+            print(f"⚠️ REGRESI {key}: {ratio:.2f}x lebih lambat")
+        if regressions:
+            return 1
+        print(f"✅ Tidak ada regresi di atas {args.threshold:.0%}")
+    return 0 if alloc_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
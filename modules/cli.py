@@ -0,0 +1,313 @@
+import argparse
+import sys
+
+# heavy modules (numpy, matplotlib) are imported inside each command so that
+# `--help` and the headless paths only pay for what they use
+
+
+def load_surface(args, domains, mf=None, rules=None):
+    # the surface must match the controller this command would otherwise run:
+    # lazy_inputs memberships and the default rules, as `surface` builds it
+    from membership import build_memberships
+    from rules import build_rules
+    from surface import ControlSurface
+
+    if mf is None:
+        mf, rules = build_memberships(domains, lazy_inputs=True), build_rules()
+    return ControlSurface.load(args.surface, domains, mf, rules, args.reducer)
+
+
+def cmd_infer(args):
+    if args.reducer in ("bmm", "nt"):
+        from controller import FuzzyController
+
+        controller = FuzzyController(resolution=args.resolution, reducer=args.reducer)
+        move = controller.move(args.height, args.distance)
+    else:
+        # FuzzyController only carries the closed-form centroid reducers
+        from domains import create_domains
+        from membership import build_memberships
+        from rules import build_rules
+        from inference import infer_batch
+
+        domains = create_domains(args.resolution)
+        mf = build_memberships(domains, lazy_inputs=True)
+        move = infer_batch(
+            args.height, args.distance, domains, mf, build_rules(), args.reducer
+        )[2][0]
+    print(f"{move:.4f}")
+
+
+def cmd_simulate(args):
+    from domains import create_domains
+    from membership import build_memberships
+    from rules import build_rules, CompiledRuleBase
+    from simulation import simulate
+
+    domains = create_domains(args.resolution)
+    mf = build_memberships(domains, lazy_inputs=True)
+    rules = CompiledRuleBase(build_rules(), mf)
+
+    surface = load_surface(args, domains, mf, rules) if args.surface else None
+
+    simulate(
+        domains,
+        mf,
+        rules,
+        args.height,
+        args.distance,
+        max_epoch=args.max_epoch,
+        stable_th=args.stable_th,
+        surface=surface,
+        reducer=args.reducer,
+    )
+
+
+def cmd_equilibrium(args):
+    from domains import create_domains
+    from membership import build_memberships
+    from rules import build_rules
+    from equilibrium import batch_move_fn, equilibrium_report
+
+    domains = create_domains(args.resolution)
+    mf = build_memberships(domains, lazy_inputs=True)
+    move_fn = batch_move_fn(domains, mf, build_rules(), args.reducer)
+    if args.heights:
+        stages = {f"{h:g} cm": h for h in args.heights}
+    else:
+        from accuracy import STAGE_HEIGHTS as stages
+    equilibrium_report(
+        move_fn, stages, domains=domains, n_grid=args.grid, xtol=args.xtol
+    )
+
+
+def cmd_montecarlo(args):
+    from montecarlo import run_montecarlo
+
+    run_montecarlo(
+        replicas=args.replicas,
+        noise={
+            "kind": args.noise,
+            "height_sigma": args.height_sigma,
+            "distance_sigma": args.distance_sigma,
+            "gain_sigma": args.gain_sigma,
+            "deadband": args.deadband,
+        },
+        max_epoch=args.max_epoch,
+        band=args.band,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        seed=args.seed,
+        reducer=args.reducer,
+    )
+
+
+def cmd_tune(args):
+    from tuner import tune
+
+    result = tune(
+        variables=args.variables,
+        pop_size=args.pop_size,
+        generations=args.generations,
+        resolution=args.resolution,
+        workers=args.workers,
+        seed=args.seed,
+        checkpoint=args.checkpoint,
+    )
+    print(f"\nBiaya: {result['baseline_cost']:.4f} -> {result['cost']:.4f}")
+    for var, sets in result["params"].items():
+        for name, mf in sets.items():
+            print(f"{var:>9s} {name:>14s}: {mf!r}")
+
+
+def cmd_sweep(args):
+    import numpy as np
+    from sweep import run_sweep
+
+    run_sweep(
+        args.out,
+        np.linspace(*args.heights[:2], int(args.heights[2])),
+        np.linspace(*args.distances[:2], int(args.distances[2])),
+        max_epochs=args.max_epochs,
+        stable_ths=args.stable_ths,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        reducer=args.reducer,
+        artifact=args.artifact,
+    )
+
+
+def cmd_artifact(args):
+    from artifact import build_artifact
+
+    surface = None
+    if args.surface:
+        from domains import create_domains
+
+        surface = load_surface(args, create_domains(args.resolution))
+
+    manifest = build_artifact(
+        args.output, resolution=args.resolution, surface=surface, reducer=args.reducer
+    )
+    print(f"Artefak disimpan ke {args.output} (sha256 {manifest['sha256'][:12]})")
+
+
+def cmd_surface(args):
+    from domains import create_domains
+    from membership import build_memberships
+    from rules import build_rules, CompiledRuleBase
+    from surface import ControlSurface, surface_error
+
+    domains = create_domains(args.resolution)
+    mf = build_memberships(domains, lazy_inputs=True)
+    rules = CompiledRuleBase(build_rules(), mf)
+    surface = ControlSurface.build(
+        domains, mf, rules, args.n_height, args.n_distance, reducer=args.reducer
+    )
+    surface.save(args.output)
+    surface_error(surface, domains, mf, rules, reducer=args.reducer)
+    print(f"Control surface disimpan ke {args.output} (+ {args.output}.json)")
+
+
+def cmd_replay(args):
+    from replay import replay_log
+
+    surface = None
+    if args.surface:
+        from domains import create_domains
+
+        surface = load_surface(args, create_domains(args.resolution))
+
+    replay_log(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        reducer=args.reducer,
+        surface=surface,
+        resolution=args.resolution,
+    )
+
+
+def cmd_plot(args):
+    from domains import create_domains
+    from membership import build_memberships
+    from plotting import plot_all_mf
+
+    domains = create_domains(args.resolution)
+    plot_all_mf(domains, build_memberships(domains), path=args.output, show=args.show)
+    if args.output:
+        print(f"Gambar disimpan ke {args.output}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="fuzzy-lamp", description="Kontroler lampu fuzzy type-2 (headless)"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--resolution", type=int, default=300)
+        p.add_argument("--reducer", choices=["bmm", "nt", "km", "ekm"], default="bmm")
+
+    p = sub.add_parser("infer", help="hitung satu gerakan lampu")
+    p.add_argument("height", type=float)
+    p.add_argument("distance", type=float)
+    common(p)
+    p.set_defaults(func=cmd_infer)
+
+    p = sub.add_parser("simulate", help="simulasi closed loop satu lampu")
+    p.add_argument("height", type=float)
+    p.add_argument("distance", type=float)
+    p.add_argument("--max-epoch", type=int, default=50)
+    p.add_argument("--stable-th", type=float, default=1)
+    p.add_argument("--surface", help="file .npy dari `surface`")
+    common(p)
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("equilibrium", help="jarak stabil tanpa iterasi epoch")
+    p.add_argument("heights", type=float, nargs="*", help="default: tiap fase")
+    p.add_argument("--grid", type=int, default=101)
+    p.add_argument("--xtol", type=float, default=1e-4)
+    common(p)
+    p.set_defaults(func=cmd_equilibrium)
+
+    p = sub.add_parser("montecarlo", help="robustness terhadap noise sensor/aktuator")
+    p.add_argument("--replicas", type=int, default=20000)
+    p.add_argument("--noise", choices=["gaussian", "uniform"], default="gaussian")
+    p.add_argument("--height-sigma", type=float, default=1.0)
+    p.add_argument("--distance-sigma", type=float, default=0.5)
+    p.add_argument("--gain-sigma", type=float, default=0.05)
+    p.add_argument("--deadband", type=float, default=0.2)
+    p.add_argument("--max-epoch", type=int, default=50)
+    p.add_argument("--band", type=float, default=1.0, help="pita settle (cm)")
+    p.add_argument("--chunk-size", type=int, default=5000)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+    common(p)
+    p.set_defaults(func=cmd_montecarlo)
+
+    p = sub.add_parser("tune", help="tuning parameter MF (differential evolution)")
+    p.add_argument(
+        "--variables",
+        nargs="+",
+        choices=["height", "distance", "output"],
+        default=["height", "distance", "output"],
+    )
+    p.add_argument("--pop-size", type=int, default=40)
+    p.add_argument("--generations", type=int, default=100)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--checkpoint", help="file .npz, dilanjutkan bila sudah ada")
+    p.add_argument("--resolution", type=int, default=300)
+    p.set_defaults(func=cmd_tune)
+
+    p = sub.add_parser("sweep", help="sweep parameter paralel")
+    p.add_argument("out")
+    p.add_argument("--heights", type=float, nargs=3, default=[0, 110, 111])
+    p.add_argument("--distances", type=float, nargs=3, default=[0, 100, 101])
+    p.add_argument("--max-epochs", type=int, nargs="+", default=[50])
+    p.add_argument("--stable-ths", type=float, nargs="+", default=[1])
+    p.add_argument("--chunk-size", type=int, default=5000)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--artifact", help="artefak kontroler (default: dibuat di out)")
+    common(p)
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("artifact", help="kompilasi kontroler ke satu file biner")
+    p.add_argument("output")
+    p.add_argument("--surface", help="file .npy dari `surface` untuk disertakan")
+    common(p)
+    p.set_defaults(func=cmd_artifact)
+
+    p = sub.add_parser("surface", help="prekomputasi ControlSurface ke file .npy")
+    p.add_argument("output")
+    p.add_argument("--n-height", type=int, default=221)
+    p.add_argument("--n-distance", type=int, default=201)
+    common(p)
+    p.set_defaults(func=cmd_surface)
+
+    p = sub.add_parser("replay", help="proses log sensor CSV/NPY per chunk")
+    p.add_argument("input", help="CSV/NPY kolom timestamp,height,distance")
+    p.add_argument("output", help="CSV/NPY keluaran timestamp,height,distance,move")
+    p.add_argument("--chunk-size", type=int, default=100000)
+    p.add_argument("--surface", help="file .npy dari `surface`")
+    common(p)
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("plot", help="gambar fungsi keanggotaan")
+    p.add_argument("--output", "-o", help="simpan ke file (PNG/SVG/PDF)")
+    p.add_argument("--show", action="store_true", help="tampilkan jendela")
+    p.add_argument("--resolution", type=int, default=300)
+    p.set_defaults(func=cmd_plot)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import numpy as np
+
+from domains import create_domains
+from membership import build_parametric_memberships, sample_memberships
+from rules import build_rules, CompiledRuleBase
+from inference import infer_batch
+from memo import fingerprint
+from artifact import artifact_controller, save_artifact
+
+
+def _input_coeffs(sets, dtype):
+    mean, sigma_upper, sigma_lower = np.array(
+        [mf.params() for mf in sets.values()], dtype=dtype
+    ).T
+    return mean, -0.5 / sigma_upper**2, -0.5 / sigma_lower**2
+
+
+class FuzzyController:
+    # one instance per thread: the scratch buffers are reused on every call
+    __slots__ = (
+        "domains",
+        "params",
+        "mf",
+        "rules",
+        "reducer",
+        "fingerprint",
+        "_xo",
+        "_h",
+        "_d",
+        "_strength",
+        "_rule_strength",
+        "_gather_idx",
+        "_gathered",
+        "_gathered_cols",
+        "_out_strength",
+        "_clip_plan",
+        "_tmp",
+        "_agg",
+        "_ones",
+        "_moments",
+        "_areas",
+        "_half",
+    )
+
+    def __init__(
+        self,
+        params=None,
+        rules=None,
+        resolution=300,
+        dtype=np.float64,
+        reducer="bmm",
+    ):
+        if reducer not in ("bmm", "nt"):
+            raise ValueError(
+                f"FuzzyController supports 'bmm' and 'nt', not {reducer!r}"
+            )
+        self.domains = create_domains(resolution, dtype)
+        self.reducer = reducer
+        self._xo = self.domains["output"]
+        self._build(params or build_parametric_memberships(), rules or build_rules())
+
+    @classmethod
+    def from_artifact(cls, path, reducer=None, verify=False):
+        # cold start is a file map: domains, output MF tensor and rule
+        # indices are views of the artifact, only the scratch buffers are new
+        art = artifact_controller(path, verify)
+        reducer = reducer or art["manifest"]["reducer"]
+        if reducer not in ("bmm", "nt"):
+            raise ValueError(
+                f"FuzzyController supports 'bmm' and 'nt', not {reducer!r}"
+            )
+        self = object.__new__(cls)
+        self.domains = art["domains"]
+        self.reducer = reducer
+        self._xo = self.domains["output"]
+        self.params = art["params"]
+        self.mf = art["mf"]
+        self.rules = art["rules"]
+        self.fingerprint = art["manifest"]["fingerprint"]
+        self._allocate()
+        return self
+
+    def save_artifact(self, path, surface=None):
+        return save_artifact(
+            path, self.domains, self.params, self.rules.rules, surface, self.reducer
+        )
+
+    def _build(self, params, rules):
+        self.params = params
+        self.mf = sample_memberships(self.domains, params, variables=("output",))
+        self.rules = CompiledRuleBase(rules, self.mf)
+        self.fingerprint = fingerprint(params, self.rules.rules)
+        self._allocate()
+
+    def set_memberships(self, params):
+        self._build(params, self.rules.rules)
+
+    def set_rules(self, rules):
+        self._build(self.params, rules)
+
+    def _allocate(self):
+        dtype = self._xo.dtype
+        crb = self.rules
+
+        # per input: (mean, -1/2su^2, -1/2sl^2, z, tmp_u, tmp_l, mu, gathered mu)
+        self._h = (
+            _input_coeffs(self.params["height"], dtype)
+            + tuple(np.empty(len(crb.height_sets), dtype) for _ in range(4))
+            + (np.empty(len(crb), dtype),)
+        )
+        self._d = (
+            _input_coeffs(self.params["distance"], dtype)
+            + tuple(np.empty(len(crb.distance_sets), dtype) for _ in range(4))
+            + (np.empty(len(crb), dtype),)
+        )
+
+        # slot len(crb) stays 0 and pads output sets with fewer rules
+        self._strength = np.zeros(len(crb) + 1, dtype)
+        self._rule_strength = self._strength[:-1]
+        width = max(len(idx) for idx in crb.rules_by_output)
+        self._gather_idx = np.full((len(crb.output_sets), width), len(crb), np.intp)
+        for k, idx in enumerate(crb.rules_by_output):
+            self._gather_idx[k, : len(idx)] = idx
+        self._gathered = np.empty(self._gather_idx.shape, dtype)
+        cols = [self._gathered[:, j] for j in range(width)]
+        self._gathered_cols = (cols[0], tuple(cols[1:]))
+
+        # broadcast reductions make numpy allocate iterator buffers, so the
+        # per-output clip/max runs over prebuilt views instead
+        self._out_strength = np.empty(len(crb.output_sets), dtype)
+        plan = [
+            (crb.outputs[k], self._out_strength[k : k + 1].reshape(()))
+            for k in range(len(crb.output_sets))
+        ]
+        self._clip_plan = (plan[0], tuple(plan[1:]))
+        self._tmp = np.empty(crb.outputs.shape[1:], dtype)
+        self._agg = np.empty(crb.outputs.shape[1:], dtype)
+        self._ones = np.ones(crb.outputs.shape[2], dtype)
+        self._moments = np.empty(2, dtype)
+        self._areas = np.empty(2, dtype)
+        # a Python scalar operand is boxed into a fresh 0-d array per ufunc call
+        self._half = np.array(0.5, dtype)
+
+    def spawn(self):
+        # new instance sharing the read-only tensors, with its own buffers
+        other = object.__new__(FuzzyController)
+        shared = ("domains", "params", "mf", "rules", "reducer", "fingerprint", "_xo")
+        for name in shared:
+            setattr(other, name, getattr(self, name))
+        other._allocate()
+        return other
+
+    def _fuzzify(self, value, buffers, idx):
+        mean, cu, cl, z, tu, tl, mu, gathered = buffers
+        z.fill(value)
+        np.subtract(z, mean, out=z)
+        np.square(z, out=z)
+        np.multiply(z, cu, out=tu)
+        np.exp(tu, out=tu)
+        np.multiply(z, cl, out=tl)
+        np.exp(tl, out=tl)
+        np.add(tu, tl, out=mu)
+        np.multiply(mu, self._half, out=mu)
+        # the method, unlike np.take, skips the dispatch wrapper's allocations
+        mu.take(idx, out=gathered, mode="clip")
+        return gathered
+
+    def infer(self, plant_height, lamp_distance):
+        crb = self.rules
+        sh = self._fuzzify(plant_height, self._h, crb.h_idx)
+        sd = self._fuzzify(lamp_distance, self._d, crb.d_idx)
+        np.minimum(sh, sd, out=self._rule_strength)
+
+        self._strength.take(self._gather_idx, out=self._gathered, mode="clip")
+        first, rest = self._gathered_cols
+        np.copyto(self._out_strength, first)
+        for col in rest:
+            np.maximum(self._out_strength, col, out=self._out_strength)
+
+        agg, tmp = self._agg, self._tmp
+        (mf0, s0), rest = self._clip_plan
+        np.minimum(mf0, s0, out=agg)
+        for mf, s in rest:
+            np.minimum(mf, s, out=tmp)
+            np.maximum(agg, tmp, out=agg)
+        # view into the workspace: copy it if it must outlive the next call
+        return self._agg
+
+    def move(self, plant_height, lamp_distance):
+        agg = self.infer(plant_height, lamp_distance)
+        np.dot(agg, self._xo, out=self._moments)
+        np.dot(agg, self._ones, out=self._areas)
+        mu, ml = self._moments.item(0), self._moments.item(1)
+        au, al = self._areas.item(0), self._areas.item(1)
+
+        if self.reducer == "nt":
+            return (mu + ml) / (au + al) if au + al > 0 else 0.0
+        cu = mu / au if au > 0 else 0.0
+        cl = ml / al if al > 0 else 0.0
+        return (cu + cl) / 2
+
+    def move_batch(self, heights, distances):
+        return infer_batch(
+            heights, distances, self.domains, self.mf, self.rules, self.reducer
+        )[2]
+
+    def simulate(self, plant_height, lamp_distance, max_epoch=50, stable_th=1):
+        pos = lamp_distance
+        for i in range(max_epoch):
+            move = self.move(plant_height, pos)
+            if abs(move) < stable_th:
+                return i + 1, pos, True
+            pos += move
+        return max_epoch, pos, False
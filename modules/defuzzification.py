@@ -1,4 +1,5 @@
 import numpy as np
+from type_reduction import bmm
 
 
 def defuzz(x, upper, lower):
@@ -8,3 +9,7 @@ def defuzz(x, upper, lower):
         return (cu + cl) / 2
     except ZeroDivisionError:
         return 0
+
+
+def defuzz_batch(x, upper, lower):
+    return bmm(x, upper, lower)
@@ -1,9 +1,9 @@
 import numpy as np
 
 
-def create_domains():
+def create_domains(resolution=300, dtype=np.float64):
     return {
-        "height": np.linspace(0, 110, 300),
-        "distance": np.linspace(0, 100, 300),
-        "output": np.linspace(-50, 50, 300),
+        "height": np.linspace(0, 110, resolution, dtype=dtype),
+        "distance": np.linspace(0, 100, resolution, dtype=dtype),
+        "output": np.linspace(-50, 50, resolution, dtype=dtype),
     }
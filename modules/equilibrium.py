@@ -0,0 +1,243 @@
+import numpy as np
+
+from domains import create_domains
+from inference import move_batch
+from rules import compile_rules
+
+# classification of a root r of g(d) = move(h, d) under pos += g(pos):
+# the iteration contracts when |1 + g'(r)| < 1. A root with |g'| < slope_tol
+# lies on a plateau where the lamp barely moves anywhere: it is neutral and
+# the whole plateau, not the crossing, is the equilibrium
+STABLE, UNSTABLE, OSCILLATORY, NEUTRAL = "stable", "unstable", "oscillatory", "neutral"
+
+
+def batch_move_fn(domains, mf, rules, reducer="bmm"):
+    crb = compile_rules(rules, mf)
+    return lambda h, d: move_batch(h, d, domains, mf, crb, reducer)
+
+
+def classify(slope, slope_tol=1e-2):
+    slope = np.asarray(slope, dtype=float)
+    kind = np.where(slope >= 0, UNSTABLE, np.where(slope <= -2, OSCILLATORY, STABLE))
+    return np.where(np.abs(slope) < slope_tol, NEUTRAL, kind).astype(object)
+
+
+def _plateau_edges(move_fn, h, inside, outside, move_tol, band_xtol, stats):
+    # bisect between a grid point on the plateau and its neighbour off it
+    inside, outside = inside.copy(), outside.copy()
+    while inside.size and np.max(np.abs(inside - outside)) > band_xtol:
+        mid = 0.5 * (inside + outside)
+        flat = np.abs(np.asarray(move_fn(h, mid), dtype=float)) < move_tol
+        stats["calls"] += 1
+        stats["points"] += mid.size
+        inside = np.where(flat, mid, inside)
+        outside = np.where(flat, outside, mid)
+    return inside
+
+
+def _illinois(move_fn, h, a, b, fa, fb, xtol, ftol, max_iter, stats):
+    # vectorized regula falsi (Illinois variant) over every bracket at once;
+    # each pass is one batched controller call on the still-open brackets
+    x = b.copy()
+    fx = fb.copy()
+    open_ = np.arange(a.size)
+    for _ in range(max_iter):
+        if open_.size == 0:
+            break
+        A, B, FA, FB = a[open_], b[open_], fa[open_], fb[open_]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = B - FB * (B - A) / (FB - FA)
+        # fall back to bisection if the secant leaves the bracket
+        bad = ~np.isfinite(c) | (c <= np.minimum(A, B)) | (c >= np.maximum(A, B))
+        c[bad] = 0.5 * (A[bad] + B[bad])
+
+        fc = np.asarray(move_fn(h[open_], c), dtype=float)
+        stats["calls"] += 1
+        stats["points"] += c.size
+
+        flip = fc * FB < 0
+        a[open_] = np.where(flip, B, A)
+        fa[open_] = np.where(flip, FB, 0.5 * FA)
+        b[open_], fb[open_] = c, fc
+        x[open_], fx[open_] = c, fc
+
+        done = (np.abs(b[open_] - a[open_]) < xtol) | (np.abs(fc) < ftol)
+        open_ = open_[~done]
+    return x, fx
+
+
+def find_equilibria(
+    move_fn,
+    heights,
+    domains=None,
+    lo=None,
+    hi=None,
+    n_grid=101,
+    xtol=1e-4,
+    ftol=1e-9,
+    max_iter=50,
+    slope_dx=0.05,
+    slope_tol=1e-2,
+    move_tol=1e-3,
+    band_xtol=1e-2,
+):
+    xd = (domains or create_domains())["distance"]
+    lo = float(xd[0]) if lo is None else lo
+    hi = float(xd[-1]) if hi is None else hi
+    heights = np.atleast_1d(np.asarray(heights, dtype=float))
+    stats = {"calls": 0, "points": 0}
+
+    # 1) bracket: one batched call on a (heights, grid) mesh
+    grid = np.linspace(lo, hi, n_grid)
+    H, D = np.meshgrid(heights, grid, indexing="ij")
+    g = np.asarray(move_fn(H.ravel(), D.ravel()), dtype=float).reshape(H.shape)
+    stats["calls"] += 1
+    stats["points"] += g.size
+
+    s = np.sign(g)
+    row_b, col_b = np.nonzero(s[:, :-1] * s[:, 1:] < 0)
+    row_z, col_z = np.nonzero(s == 0)
+
+    # 2) refine every bracket together
+    roots, residual = _illinois(
+        move_fn,
+        heights[row_b],
+        grid[col_b],
+        grid[col_b + 1],
+        g[row_b, col_b],
+        g[row_b, col_b + 1],
+        xtol,
+        ftol,
+        max_iter,
+        stats,
+    )
+
+    index = np.concatenate([row_b, row_z])
+    distance = np.concatenate([roots, grid[col_z]])
+    residual = np.concatenate([residual, np.zeros(row_z.size)])
+    order = np.lexsort((distance, index))
+    index, distance, residual = index[order], distance[order], residual[order]
+
+    # 3) slope by central difference, again one batched call
+    dx = np.minimum(slope_dx, np.minimum(distance - lo, hi - distance))
+    dx = np.where(dx > 0, dx, slope_dx)
+    fg = np.asarray(
+        move_fn(
+            np.concatenate([heights[index], heights[index]]),
+            np.concatenate([distance + dx, distance - dx]),
+        ),
+        dtype=float,
+    )
+    stats["calls"] += 1
+    stats["points"] += fg.size
+    slope = (fg[: index.size] - fg[index.size :]) / (2 * dx)
+
+    kind = classify(slope, slope_tol)
+
+    # 4) neutral roots: widen to the plateau |move| < move_tol around them,
+    # found on the grid and refined by batched bisection at both edges
+    band_lo, band_hi = distance.copy(), distance.copy()
+    flat = np.abs(g) < move_tol
+    neutral = np.flatnonzero(kind == NEUTRAL)
+    left, right = [], []
+    for j in neutral:
+        row = flat[index[j]]
+        k = int(np.argmin(np.abs(grid - distance[j])))
+        if not row[k]:
+            left.append((j, k, k))
+            right.append((j, k, k))
+            continue
+        a = b = k
+        while a > 0 and row[a - 1]:
+            a -= 1
+        while b < n_grid - 1 and row[b + 1]:
+            b += 1
+        left.append((j, a, max(a - 1, 0)))
+        right.append((j, b, min(b + 1, n_grid - 1)))
+    for side, out in ((left, band_lo), (right, band_hi)):
+        if side:
+            j, k_in, k_out = (np.array(v) for v in zip(*side))
+            out[j] = _plateau_edges(
+                move_fn,
+                heights[index[j]],
+                grid[k_in],
+                grid[k_out],
+                move_tol,
+                band_xtol,
+                stats,
+            )
+
+    # several crossings inside one plateau describe the same equilibrium
+    keep = np.ones(index.size, dtype=bool)
+    seen = set()
+    for j in neutral:
+        key = (index[j], band_lo[j], band_hi[j])
+        keep[j] = key not in seen
+        seen.add(key)
+
+    return {
+        "height_index": index[keep],
+        "height": heights[index[keep]],
+        "distance": distance[keep],
+        "band_lo": band_lo[keep],
+        "band_hi": band_hi[keep],
+        "residual": residual[keep],
+        "slope": slope[keep],
+        "kind": kind[keep],
+        "stable": kind[keep] == STABLE,
+        "stats": stats,
+    }
+
+
+def stable_distance(eq, n_heights, reference=None):
+    # one stable equilibrium per height (NaN if none); with several, the one
+    # closest to `reference` (scalar or per-height), else the lowest distance
+    out = np.full(n_heights, np.nan)
+    idx = eq["height_index"][eq["stable"]]
+    dist = eq["distance"][eq["stable"]]
+    if reference is None:
+        key = dist
+    else:
+        ref = np.broadcast_to(np.asarray(reference, dtype=float), (n_heights,))
+        key = np.abs(dist - ref[idx])
+    order = np.lexsort((-key, idx))
+    # last write per height wins: the smallest key
+    out[idx[order]] = dist[order]
+    return out
+
+
+def target_band(eq, n_heights):
+    # (lo, hi) each height should settle into: its lowest stable root as a
+    # point, else its first neutral plateau; NaN where it has neither
+    lo = np.full(n_heights, np.nan)
+    hi = np.full(n_heights, np.nan)
+    for kind in (NEUTRAL, STABLE):
+        sel = np.flatnonzero(eq["kind"] == kind)[::-1]
+        # reversed so the first entry per height is written last
+        lo[eq["height_index"][sel]] = eq["band_lo"][sel]
+        hi[eq["height_index"][sel]] = eq["band_hi"][sel]
+    return lo, hi
+
+
+def equilibrium_report(move_fn, stage_heights, **kwargs):
+    names = list(stage_heights)
+    eq = find_equilibria(move_fn, list(stage_heights.values()), **kwargs)
+
+    print("\n=== EKUILIBRIUM PER FASE ===")
+    for i, name in enumerate(names):
+        sel = eq["height_index"] == i
+        if not sel.any():
+            print(f"{name:>10s} | tidak ada titik ekuilibrium di domain")
+            continue
+        for d, a, b, slope, kind in zip(
+            eq["distance"][sel],
+            eq["band_lo"][sel],
+            eq["band_hi"][sel],
+            eq["slope"][sel],
+            eq["kind"][sel],
+        ):
+            where = f"{a:7.3f}-{b:.3f} cm" if kind == NEUTRAL else f"{d:7.3f} cm"
+            print(f"{name:>10s} | jarak: {where} | slope: {slope:+.4f} | {kind}")
+    stats = eq["stats"]
+    print(f"Evaluasi: {stats['calls']} panggilan batch, {stats['points']} titik")
+    return eq
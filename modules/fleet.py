@@ -0,0 +1,128 @@
+import numpy as np
+
+from inference import infer_batch
+from rules import compile_rules
+
+# lane status; UNDECIDED lanes are still moving when max_epoch runs out
+UNDECIDED, CONVERGED, OSCILLATING, DIVERGING = range(4)
+STATUS_NAMES = ("undecided", "converged", "oscillating", "diverging")
+
+
+def reverses(path):
+    # True if the steps along path go both up and down
+    steps = np.diff(path)
+    return bool(steps.min() < 0 < steps.max())
+
+
+def simulate_fleet(
+    domains,
+    mf,
+    rules,
+    plant_heights,
+    lamp_distances,
+    max_epoch=50,
+    stable_th=1,
+    surface=None,
+    reducer="bmm",
+    instr=None,
+    telemetry=None,
+    max_period=8,
+    cycle_tol=1e-3,
+    bounds=None,
+):
+    heights, pos = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(plant_heights, dtype=float)),
+        np.atleast_1d(np.asarray(lamp_distances, dtype=float)),
+    )
+    pos = pos.copy()
+    n = pos.size
+    crb = None if surface is not None else compile_rules(rules, mf)
+
+    trajectory = np.empty((max_epoch + 1, n))
+    trajectory[0] = pos
+    moves = np.full((max_epoch, n), np.nan)
+    epochs = np.full(n, max_epoch)
+    converged = np.zeros(n, dtype=bool)
+    status = np.full(n, UNDECIDED, dtype=np.int8)
+    period = np.zeros(n, dtype=np.int16)
+    lo, hi = bounds or (domains["distance"][0], domains["distance"][-1])
+    active = np.arange(n)
+
+    for i in range(max_epoch):
+        if surface is not None:
+            move = surface.query(heights[active], pos[active])
+        else:
+            move = infer_batch(
+                heights[active], pos[active], domains, mf, crb, reducer, instr
+            )[2]
+        moves[i, active] = move
+        if telemetry is not None:
+            telemetry.append_batch(
+                i + 1, pos[active], move, pos[active] + move, np.abs(move), active
+            )
+
+        stable = np.abs(move) < stable_th
+        converged[active[stable]] = True
+        status[active[stable]] = CONVERGED
+        epochs[active[stable]] = i + 1
+
+        # converged lanes keep their position, the rest take the move
+        active = active[~stable]
+        pos[active] += move[~stable]
+        trajectory[i + 1] = pos
+
+        # a moving lane is settled once it leaves the domain or lands back on
+        # position (within cycle_tol) it held 2..max_period epochs ago, having
+        # moved both ways since: a slow monotone creep is not a cycle
+        now = pos[active]
+        out = (now < lo) | (now > hi)
+        cycle = np.zeros(now.size, dtype=bool)
+        start = max(0, i + 1 - max_period)
+        if i > start:
+            # row r: did the moves from epoch start + r to now change sign
+            step = moves[start : i + 1, active]
+            up = np.logical_or.accumulate((step > 0)[::-1], axis=0)[::-1]
+            down = np.logical_or.accumulate((step < 0)[::-1], axis=0)[::-1]
+            match = np.abs(trajectory[start:i, active] - now) <= cycle_tol
+            match &= (up & down)[: i - start]
+            cycle = match.any(axis=0) & ~out
+            # the most recent match gives the shortest period
+            last = i - 1 - np.argmax(match[::-1], axis=0)
+            period[active[cycle]] = i + 1 - last[cycle]
+
+        status[active[out]] = DIVERGING
+        status[active[cycle]] = OSCILLATING
+        epochs[active[out | cycle]] = i + 1
+        active = active[~(out | cycle)]
+
+        if active.size == 0:
+            trajectory = trajectory[: i + 2]
+            moves = moves[: i + 1]
+            break
+
+    return {
+        "epochs": epochs,
+        "converged": converged,
+        "status": status,
+        "period": period,
+        "final": pos,
+        "trajectory": trajectory,
+        "moves": moves,
+    }
+
+
+def stability_map(domains, mf, rules, heights, distances, **kwargs):
+    # status of every (height, start distance) pair, shaped (heights, distances)
+    H, D = np.meshgrid(heights, distances, indexing="ij")
+    res = simulate_fleet(domains, mf, rules, H.ravel(), D.ravel(), **kwargs)
+    return {
+        "status": res["status"].reshape(H.shape),
+        "period": res["period"].reshape(H.shape),
+        "epochs": res["epochs"].reshape(H.shape),
+        "final": res["final"].reshape(H.shape),
+    }
+
+
+def status_counts(status):
+    counts = np.bincount(np.ravel(status), minlength=len(STATUS_NAMES))
+    return dict(zip(STATUS_NAMES, counts.tolist()))
@@ -1,7 +1,20 @@
 import numpy as np
+from membership import GaussianT2
 
 
 def fuzzify(value, x, mf):
+    if isinstance(mf, GaussianT2):
+        return mf.mu(value)
     upper = np.interp(value, x, mf[0])
     lower = np.interp(value, x, mf[1])
     return (upper + lower) / 2
+
+
+def fuzzify_sets(values, x, mf_set):
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    sets = list(mf_set.values())
+    if all(isinstance(mf, GaussianT2) for mf in sets):
+        mean, sigma_upper, sigma_lower = np.array([mf.params() for mf in sets]).T
+        z2 = -0.5 * (values[:, None] - mean) ** 2
+        return (np.exp(z2 / sigma_upper**2) + np.exp(z2 / sigma_lower**2)) / 2
+    return np.stack([fuzzify(values, x, mf) for mf in mf_set.values()], axis=1)
@@ -1,18 +1,27 @@
 import numpy as np
-from fuzzification import fuzzify
+from fuzzification import fuzzify, fuzzify_sets
+from rules import compile_rules, CompiledRuleBase
+from type_reduction import get_reducer
+from instrumentation import null_stage
 
 
-def infer(plant_height, lamp_distance, domains, mf, rules):
+def fuzzify_inputs(plant_height, lamp_distance, domains, mf):
     xh = domains["height"]
     xd = domains["distance"]
-    xo = domains["output"]
 
     μh = {k: fuzzify(plant_height, xh, v) for k, v in mf["height"].items()}
     μd = {k: fuzzify(lamp_distance, xd, v) for k, v in mf["distance"].items()}
+    return μh, μd
+
+
+def aggregate(μh, μd, domains, mf, rules):
+    xo = domains["output"]
 
     agg_u = np.zeros_like(xo)
     agg_l = np.zeros_like(xo)
 
+    if isinstance(rules, CompiledRuleBase):
+        rules = rules.rules
     for h, d, out in rules:
         strength = min(μh[h], μd[d])
         u, l = mf["output"][out]
@@ -20,3 +29,83 @@ def infer(plant_height, lamp_distance, domains, mf, rules):
         agg_l = np.fmax(agg_l, np.fmin(strength, l))
 
     return agg_u, agg_l
+
+
+def infer(plant_height, lamp_distance, domains, mf, rules):
+    μh, μd = fuzzify_inputs(plant_height, lamp_distance, domains, mf)
+    return aggregate(μh, μd, domains, mf, rules)
+
+
+def infer_batch(heights, distances, domains, mf, rules, reducer="bmm", instr=None):
+    stage = instr.stage if instr is not None else null_stage
+    heights, distances = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(heights, dtype=float)),
+        np.atleast_1d(np.asarray(distances, dtype=float)),
+    )
+    crb = compile_rules(rules, mf)
+
+    dtype = crb.outputs.dtype
+
+    with stage("fuzzify"):
+        μh = fuzzify_sets(heights, domains["height"], mf["height"]).astype(dtype)
+        μd = fuzzify_sets(distances, domains["distance"], mf["distance"]).astype(dtype)
+
+    with stage("aggregate"):
+        agg = crb.aggregate(crb.strengths(μh, μd))
+        agg_u, agg_l = agg[:, 0], agg[:, 1]
+
+    with stage("defuzz"):
+        moves = get_reducer(reducer)(domains["output"], agg_u, agg_l)
+
+    return agg_u, agg_l, moves
+
+
+def move_batch(
+    heights, distances, domains, mf, rules, reducer="bmm", chunk=2048, instr=None
+):
+    # moves only, with the (chunk, n_outputs, 2, n_points) intermediates bounded
+    heights, distances = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(heights, dtype=float)),
+        np.atleast_1d(np.asarray(distances, dtype=float)),
+    )
+    crb = compile_rules(rules, mf)
+    moves = np.empty(heights.size, dtype=domains["output"].dtype)
+    for i in range(0, heights.size, chunk):
+        moves[i : i + chunk] = infer_batch(
+            heights[i : i + chunk],
+            distances[i : i + chunk],
+            domains,
+            mf,
+            crb,
+            reducer,
+            instr,
+        )[2]
+    return moves
+
+
+def infer_sparse(plant_height, lamp_distance, domains, mf, rules, eps=1e-6, stats=None):
+    crb = compile_rules(rules, mf)
+
+    μh = fuzzify_sets(plant_height, domains["height"], mf["height"])[0]
+    μd = fuzzify_sets(lamp_distance, domains["distance"], mf["distance"])[0]
+    active, strength = crb.active_rules(μh, μd, eps)
+
+    out = np.zeros(len(crb.output_sets))
+    np.maximum.at(out, crb.o_idx[active], strength)
+    fired = np.flatnonzero(out)
+
+    if fired.size:
+        agg = np.fmin(out[fired, None, None], crb.outputs[fired]).max(axis=0)
+    else:
+        agg = np.zeros(crb.outputs.shape[1:])
+
+    if stats is not None:
+        stats["calls"] = stats.get("calls", 0) + 1
+        stats["rule_evals"] = stats.get("rule_evals", 0) + active.size
+        stats["clips"] = stats.get("clips", 0) + fired.size
+
+    return agg[0], agg[1]
+
+
+def rule_evals_per_call(stats):
+    return stats.get("rule_evals", 0) / max(stats.get("calls", 0), 1)
@@ -0,0 +1,119 @@
+import contextlib
+import time
+import tracemalloc
+
+import numpy as np
+
+DEFAULT_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 1.0)
+
+_NULL = contextlib.nullcontext()
+
+
+def null_stage(name):
+    return _NULL
+
+
+class StageStats:
+    __slots__ = ("count", "total", "buckets", "peak_bytes")
+
+    def __init__(self, n_buckets):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = np.zeros(n_buckets + 1, dtype=np.int64)  # last is +Inf
+        self.peak_bytes = 0
+
+
+class _Stage:
+    __slots__ = ("instr", "stats", "t0", "mem0")
+
+    def __init__(self, instr, stats):
+        self.instr = instr
+        self.stats = stats
+
+    def __enter__(self):
+        if self.instr.trace_memory:
+            self.mem0 = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        s = self.stats
+        s.count += 1
+        s.total += elapsed
+        s.buckets[np.searchsorted(self.instr.bounds, elapsed)] += 1
+        if self.instr.trace_memory:
+            # nested stages share tracemalloc's single peak counter, so the
+            # outer stage's peak includes the inner ones
+            peak = tracemalloc.get_traced_memory()[1] - self.mem0
+            s.peak_bytes = max(s.peak_bytes, peak)
+        return False
+
+
+class Instrumentation:
+    def __init__(self, enabled=True, trace_memory=False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.bounds = np.asarray(buckets, dtype=float)
+        self.stats = {}
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = StageStats(len(self.bounds))
+        return _Stage(self, stats)
+
+    def to_openmetrics(self, prefix="fuzzy_stage"):
+        lines = [
+            f"# TYPE {prefix}_seconds histogram",
+            f"# HELP {prefix}_seconds Latency per control-loop stage.",
+        ]
+        for name, s in self.stats.items():
+            cumulative = np.cumsum(s.buckets)
+            for le, c in zip(self.bounds, cumulative[:-1]):
+                lines.append(
+                    f'{prefix}_seconds_bucket{{stage="{name}",le="{le:g}"}} {c}'
+                )
+            lines.append(
+                f'{prefix}_seconds_bucket{{stage="{name}",le="+Inf"}} {s.count}'
+            )
+            lines.append(f'{prefix}_seconds_sum{{stage="{name}"}} {s.total:.9f}')
+            lines.append(f'{prefix}_seconds_count{{stage="{name}"}} {s.count}')
+        if self.trace_memory:
+            lines.append(f"# TYPE {prefix}_peak_bytes gauge")
+            lines.append(
+                f"# HELP {prefix}_peak_bytes Peak traced allocation per stage."
+            )
+            for name, s in self.stats.items():
+                lines.append(f'{prefix}_peak_bytes{{stage="{name}"}} {s.peak_bytes}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, path, prefix="fuzzy_stage"):
+        with open(path, "w") as f:
+            f.write(self.to_openmetrics(prefix))
+
+    def _quantile(self, s, q):
+        # upper bound of the bucket holding the q-th sample
+        idx = np.searchsorted(np.cumsum(s.buckets), q * s.count)
+        return self.bounds[idx] if idx < len(self.bounds) else float("inf")
+
+    def summary(self):
+        total = sum(s.total for s in self.stats.values()) or 1.0
+        rows = [
+            f"{'Stage':<12s} {'Calls':>8s} {'Total ms':>10s} {'Mean us':>10s} "
+            f"{'p99 <= us':>10s} {'Share':>7s} {'Peak KB':>9s}"
+        ]
+        for name, s in sorted(self.stats.items(), key=lambda kv: -kv[1].total):
+            mean = s.total / s.count if s.count else 0.0
+            peak = f"{s.peak_bytes / 1024:9.1f}" if self.trace_memory else f"{'-':>9s}"
+            rows.append(
+                f"{name:<12s} {s.count:8d} {s.total * 1e3:10.3f} {mean * 1e6:10.2f} "
+                f"{self._quantile(s, 0.99) * 1e6:10.0f} {s.total / total:7.1%} {peak}"
+            )
+        return "\n".join(rows)
@@ -2,7 +2,6 @@ from domains import create_domains
 from membership import build_memberships
 from rules import build_rules
 from simulation import simulate
-from plotting import plot_all_mf
 
 
 def main():
@@ -10,7 +9,9 @@ def main():
     mf = build_memberships(domains)
     rules = build_rules()
 
-    # Plot
+    # Plot (matplotlib hanya diimpor di sini)
+    from plotting import plot_all_mf
+
     plot_all_mf(domains, mf)
 
     # Input
@@ -1,36 +1,82 @@
+import math
+
 import numpy as np
 
 
-def gaussian_t2(x, mean, sigma_upper, sigma_lower):
-    upper = np.exp(-0.5 * ((x - mean) / sigma_upper) ** 2)
-    lower = np.exp(-0.5 * ((x - mean) / sigma_lower) ** 2)
-    return upper, lower
+class GaussianT2:
+    __slots__ = ("mean", "sigma_upper", "sigma_lower")
+
+    def __init__(self, mean, sigma_upper, sigma_lower):
+        self.mean = mean
+        self.sigma_upper = sigma_upper
+        self.sigma_lower = sigma_lower
+
+    def __call__(self, x):
+        z = np.subtract(x, self.mean)
+        upper = np.exp(-0.5 * (z / self.sigma_upper) ** 2)
+        lower = np.exp(-0.5 * (z / self.sigma_lower) ** 2)
+        return upper, lower
 
+    def mu(self, x):
+        if np.ndim(x) == 0:
+            z = (float(x) - self.mean) ** 2
+            upper = math.exp(-0.5 * z / self.sigma_upper**2)
+            lower = math.exp(-0.5 * z / self.sigma_lower**2)
+            return (upper + lower) / 2
+        upper, lower = self(x)
+        return (upper + lower) / 2
 
-def build_memberships(domains):
-    x_height = domains["height"]
-    x_distance = domains["distance"]
-    x_output = domains["output"]
+    def params(self):
+        return (self.mean, self.sigma_upper, self.sigma_lower)
+
+    def __repr__(self):
+        return f"GaussianT2({self.mean}, {self.sigma_upper}, {self.sigma_lower})"
+
+
+def gaussian_t2(x, mean, sigma_upper, sigma_lower):
+    return GaussianT2(mean, sigma_upper, sigma_lower)(x)
 
+
+def build_parametric_memberships():
     return {
         "height": {
-            "semai": gaussian_t2(x_height, 8, 4, 2),
-            "vegetatif": gaussian_t2(x_height, 30, 6, 3),
-            "generatif": gaussian_t2(x_height, 60, 6, 3),
-            "produktif": gaussian_t2(x_height, 90, 6, 3),
+            "semai": GaussianT2(8, 4, 2),
+            "vegetatif": GaussianT2(30, 6, 3),
+            "generatif": GaussianT2(60, 6, 3),
+            "produktif": GaussianT2(90, 6, 3),
         },
         "distance": {
-            "sangat_dekat": gaussian_t2(x_distance, 5, 3, 1.5),
-            "dekat": gaussian_t2(x_distance, 15, 5, 3),
-            "sedang": gaussian_t2(x_distance, 30, 6, 3),
-            "jauh": gaussian_t2(x_distance, 50, 7, 4),
-            "sangat_jauh": gaussian_t2(x_distance, 80, 7, 4),
+            "sangat_dekat": GaussianT2(5, 3, 1.5),
+            "dekat": GaussianT2(15, 5, 3),
+            "sedang": GaussianT2(30, 6, 3),
+            "jauh": GaussianT2(50, 7, 4),
+            "sangat_jauh": GaussianT2(80, 7, 4),
         },
         "output": {
-            "turun_banyak": gaussian_t2(x_output, -30, 6, 3),
-            "turun_sedikit": gaussian_t2(x_output, -15, 5, 2),
-            "diam": gaussian_t2(x_output, 0, 4, 2),
-            "naik_sedikit": gaussian_t2(x_output, 15, 5, 2),
-            "naik_banyak": gaussian_t2(x_output, 30, 6, 3),
+            "turun_banyak": GaussianT2(-30, 6, 3),
+            "turun_sedikit": GaussianT2(-15, 5, 2),
+            "diam": GaussianT2(0, 4, 2),
+            "naik_sedikit": GaussianT2(15, 5, 2),
+            "naik_banyak": GaussianT2(30, 6, 3),
         },
     }
+
+
+def sample_memberships(domains, params, variables=("height", "distance", "output")):
+    return {
+        var: (
+            {k: p(domains[var]) for k, p in sets.items()}
+            if var in variables
+            else dict(sets)
+        )
+        for var, sets in params.items()
+    }
+
+
+def build_memberships(domains, lazy_inputs=False):
+    # lazy_inputs keeps height/distance parametric; only the output sets,
+    # which sampled aggregation needs, are put on the grid
+    params = build_parametric_memberships()
+    if lazy_inputs:
+        return sample_memberships(domains, params, variables=("output",))
+    return sample_memberships(domains, params)
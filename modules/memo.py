@@ -0,0 +1,93 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from membership import GaussianT2
+
+
+def fingerprint(mf, rules):
+    h = hashlib.sha256()
+    for var in sorted(mf):
+        for name, m in mf[var].items():
+            h.update(f"{var}/{name}".encode())
+            if isinstance(m, GaussianT2):
+                h.update(repr(m.params()).encode())
+            else:
+                for curve in m:
+                    h.update(np.ascontiguousarray(curve).tobytes())
+    h.update(repr([tuple(r) for r in rules]).encode())
+    return h.hexdigest()
+
+
+class MemoizedController:
+    def __init__(
+        self, controller, height_res=0.1, distance_res=0.3, maxsize=65536, audit=False
+    ):
+        self.controller = controller
+        self.height_res = height_res
+        self.distance_res = distance_res
+        self.maxsize = maxsize
+        self.audit = audit
+        self.cache = OrderedDict()
+        self.fingerprint = controller.fingerprint
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.worst_height_err = 0.0
+        self.worst_distance_err = 0.0
+        self.worst_move_err = 0.0
+
+    def clear(self):
+        self.cache.clear()
+
+    def move(self, plant_height, lamp_distance):
+        if self.controller.fingerprint != self.fingerprint:
+            # MFs or rules changed under us: every cached move is stale
+            self.cache.clear()
+            self.fingerprint = self.controller.fingerprint
+            self.invalidations += 1
+
+        qh = round(plant_height / self.height_res)
+        qd = round(lamp_distance / self.distance_res)
+        h = qh * self.height_res
+        d = qd * self.distance_res
+        self.worst_height_err = max(self.worst_height_err, abs(plant_height - h))
+        self.worst_distance_err = max(self.worst_distance_err, abs(lamp_distance - d))
+
+        key = (qh, qd)
+        move = self.cache.get(key)
+        if move is None:
+            self.misses += 1
+            # evaluate at the cell centre so every input in the cell agrees
+            move = self.controller.move(h, d)
+            self.cache[key] = move
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+
+        if self.audit:
+            exact = self.controller.move(plant_height, lamp_distance)
+            self.worst_move_err = max(self.worst_move_err, abs(move - exact))
+        return move
+
+    def stats(self):
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self.cache),
+            "hit_rate": self.hits / calls if calls else 0.0,
+            "worst_height_err": float(self.worst_height_err),
+            "worst_distance_err": float(self.worst_distance_err),
+            "worst_move_err": float(self.worst_move_err) if self.audit else None,
+        }
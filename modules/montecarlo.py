@@ -0,0 +1,231 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from domains import create_domains
+from membership import build_memberships
+from rules import build_rules, CompiledRuleBase
+from inference import infer_batch
+from equilibrium import batch_move_fn, find_equilibria, target_band
+from accuracy import STAGE_HEIGHTS
+
+# sensor noise is "gaussian" (sigma = std) or "uniform" (sigma = half-width);
+# the actuator applies move * (1 + gain error) and ignores |move| < deadband
+DEFAULT_NOISE = {
+    "kind": "gaussian",
+    "height_sigma": 1.0,
+    "distance_sigma": 0.5,
+    "gain_sigma": 0.05,
+    "deadband": 0.2,
+}
+
+_controller = None
+
+
+def _worker_controller(reducer):
+    global _controller
+    if _controller is None or _controller[3] != reducer:
+        domains = create_domains()
+        mf = build_memberships(domains, lazy_inputs=True)
+        _controller = (domains, mf, CompiledRuleBase(build_rules(), mf), reducer)
+    return _controller
+
+
+def _sensor(rng, kind, sigma, size):
+    if sigma == 0:
+        return np.zeros(size)
+    if kind == "gaussian":
+        return rng.normal(0.0, sigma, size)
+    if kind == "uniform":
+        return rng.uniform(-sigma, sigma, size)
+    raise ValueError(f"unknown noise kind {kind!r}")
+
+
+def closed_loop(move_fn, heights, start, noise, rng, lo=0.0, hi=100.0, max_epoch=50):
+    # fixed-length noisy runs: with sensor noise |move| never settles below a
+    # threshold, so every replica runs max_epoch epochs and is judged after
+    n = heights.size
+    kind = noise["kind"]
+    gain = 1.0 + _sensor(rng, "gaussian", noise["gain_sigma"], n)
+    pos = start.copy()
+    trajectory = np.empty((max_epoch + 1, n))
+    trajectory[0] = pos
+    applied = np.empty((max_epoch, n))
+
+    for i in range(max_epoch):
+        h = heights + _sensor(rng, kind, noise["height_sigma"], n)
+        d = pos + _sensor(rng, kind, noise["distance_sigma"], n)
+        move = move_fn(np.clip(h, 0, None), np.clip(d, lo, hi))
+        move = np.where(np.abs(move) < noise["deadband"], 0.0, move * gain)
+        # the lamp rail is physically bounded
+        np.clip(pos + move, lo, hi, out=pos)
+        applied[i] = move
+        trajectory[i + 1] = pos
+    return trajectory, applied
+
+
+def settle_metrics(trajectory, applied, target, band=1.0, tail=10, target_hi=None):
+    # target is a point, or with target_hi the interval [target, target_hi]
+    # of a neutral equilibrium; the error is the distance outside it
+    target = np.asarray(target, dtype=float)
+    target_hi = target if target_hi is None else np.asarray(target_hi, dtype=float)
+    if np.isnan(target).any() or np.isnan(target_hi).any():
+        raise ValueError("settle target is NaN: the lane has no equilibrium")
+    max_epoch = applied.shape[0]
+    err = np.maximum(np.maximum(target - trajectory, trajectory - target_hi), 0)
+
+    # settle time: first epoch after which the lamp stays inside the band
+    outside = err > band
+    last_out = max_epoch - np.argmax(outside[::-1], axis=0)
+    settle = np.where(outside.any(axis=0), last_out + 1, 0).astype(float)
+    settle[outside[-1]] = np.nan
+
+    # oscillation: the move keeps flipping sign through the tail with a
+    # peak-to-peak swing wider than the band
+    sign = np.sign(applied[-tail:])
+    flips = np.sum(sign[1:] * sign[:-1] < 0, axis=0)
+    swing = np.ptp(trajectory[-tail:], axis=0)
+    oscillating = (flips >= tail - 2) & (swing > band)
+
+    return {
+        "settle": settle,
+        "steady_error": err[-tail:].mean(axis=0),
+        "oscillating": oscillating,
+    }
+
+
+def _run_task(task):
+    domains, mf, crb, reducer = _worker_controller(task["reducer"])
+    lo, hi = domains["distance"][0], domains["distance"][-1]
+    rng = np.random.default_rng(task["seed"])
+    n = task["replicas"]
+
+    def move_fn(h, d):
+        return infer_batch(h, d, domains, mf, crb, reducer)[2]
+
+    start = rng.uniform(lo, hi, n)
+    trajectory, applied = closed_loop(
+        move_fn,
+        np.full(n, task["height"]),
+        start,
+        task["noise"],
+        rng,
+        lo,
+        hi,
+        task["max_epoch"],
+    )
+    metrics = settle_metrics(
+        trajectory,
+        applied,
+        task["target"][0],
+        task["band"],
+        task["tail"],
+        task["target"][1],
+    )
+    return task["stage"], metrics
+
+
+def _summary(settle, steady_error, oscillating):
+    settled = ~np.isnan(settle)
+    pct = (
+        np.percentile(settle[settled], [50, 90, 99]) if settled.any() else [np.nan] * 3
+    )
+    return {
+        "replicas": int(settle.size),
+        "settled_rate": float(settled.mean()),
+        "settle_p50": float(pct[0]),
+        "settle_p90": float(pct[1]),
+        "settle_p99": float(pct[2]),
+        "steady_error_mean": float(steady_error.mean()),
+        "steady_error_p95": float(np.percentile(steady_error, 95)),
+        "oscillation_rate": float(oscillating.mean()),
+    }
+
+
+def run_montecarlo(
+    replicas=20000,
+    stages=None,
+    noise=None,
+    max_epoch=50,
+    band=1.0,
+    tail=10,
+    chunk_size=5000,
+    workers=None,
+    seed=0,
+    reducer="bmm",
+):
+    stages = stages or STAGE_HEIGHTS
+    noise = {**DEFAULT_NOISE, **(noise or {})}
+
+    # the noise-free equilibrium of each stage is the reference: a stable
+    # distance, or the plateau of a neutral one. Stages with neither are
+    # reported, not scored
+    domains = create_domains()
+    mf = build_memberships(domains, lazy_inputs=True)
+    eq = find_equilibria(
+        batch_move_fn(domains, mf, build_rules(), reducer),
+        list(stages.values()),
+        domains,
+    )
+    targets = list(zip(*target_band(eq, len(stages))))
+
+    tasks = []
+    for (stage, height), target in zip(stages.items(), targets):
+        if np.isnan(target[0]):
+            continue
+        for start in range(0, replicas, chunk_size):
+            tasks.append(
+                {
+                    "stage": stage,
+                    "height": float(height),
+                    "target": (float(target[0]), float(target[1])),
+                    "replicas": min(chunk_size, replicas - start),
+                    "noise": noise,
+                    "max_epoch": max_epoch,
+                    "band": band,
+                    "tail": tail,
+                    "reducer": reducer,
+                }
+            )
+    # one child seed per task, not per worker process: results do not depend
+    # on the worker count or on which process picks which task
+    for task, child in zip(tasks, np.random.SeedSequence(seed).spawn(len(tasks))):
+        task["seed"] = child
+
+    parts = {stage: [] for stage in stages}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for stage, metrics in pool.map(_run_task, tasks):
+            parts[stage].append(metrics)
+
+    print(f"\n=== MONTE CARLO: {replicas} replika per fase ===")
+    print(
+        f"{'Fase':>10s} {'Target':>13s} {'Settle':>7s} {'p50':>5s} {'p90':>5s} "
+        f"{'Err mean':>9s} {'Err p95':>8s} {'Osilasi':>8s}"
+    )
+    report = {}
+    for (stage, chunks), (lo, hi) in zip(parts.items(), targets):
+        where = f"{lo:13.2f}" if lo == hi else f"{lo:6.2f}-{hi:6.2f}"
+        if not chunks:
+            report[stage] = {"target": None, "equilibrium": False}
+            print(f"{stage:>10s} {'-':>13s} tidak ada titik ekuilibrium")
+            continue
+        row = _summary(
+            *(
+                np.concatenate([m[key] for m in chunks])
+                for key in ("settle", "steady_error", "oscillating")
+            )
+        )
+        row["target"] = (lo, hi)
+        row["equilibrium"] = True
+        report[stage] = row
+        print(
+            f"{stage:>10s} {where} {row['settled_rate']:7.1%} "
+            f"{row['settle_p50']:5.0f} {row['settle_p90']:5.0f} "
+            f"{row['steady_error_mean']:9.3f} {row['steady_error_p95']:8.3f} "
+            f"{row['oscillation_rate']:8.1%}"
+        )
+    return report
+
+
+if __name__ == "__main__":
+    run_montecarlo()
@@ -1,4 +1,7 @@
-import matplotlib.pyplot as plt
+import os
+import sys
+
+from membership import GaussianT2
 
 
 # def plot_mf(x, mf_set, title):
@@ -11,29 +14,52 @@ import matplotlib.pyplot as plt
 #     plt.show()
 
 
-def plot_all_mf(domains, mf):
+def _pyplot(interactive):
+    import matplotlib
+
+    headless = sys.platform.startswith("linux") and not (
+        os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+    )
+    if not interactive or headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _sampled(x, mf_set):
+    for name, mf in mf_set.items():
+        yield name, (mf(x) if isinstance(mf, GaussianT2) else mf)
+
+
+def plot_all_mf(domains, mf, path=None, show=True):
+    plt = _pyplot(interactive=show)
     fig, axs = plt.subplots(3, 1, figsize=(10, 12))
 
     # 1. Tinggi Tanaman
-    for name, (u, l) in mf["height"].items():
+    for name, (u, l) in _sampled(domains["height"], mf["height"]):
         axs[0].fill_between(domains["height"], l, u, alpha=0.3, label=name)
     axs[0].set_title("MF Tinggi Tanaman")
     axs[0].legend()
     axs[0].grid(True)
 
     # 2. Jarak Lampu
-    for name, (u, l) in mf["distance"].items():
+    for name, (u, l) in _sampled(domains["distance"], mf["distance"]):
         axs[1].fill_between(domains["distance"], l, u, alpha=0.3, label=name)
     axs[1].set_title("MF Jarak Lampu")
     axs[1].legend()
     axs[1].grid(True)
 
     # 3. Gerak Lampu
-    for name, (u, l) in mf["output"].items():
+    for name, (u, l) in _sampled(domains["output"], mf["output"]):
         axs[2].fill_between(domains["output"], l, u, alpha=0.3, label=name)
     axs[2].set_title("MF Gerak Lampu")
     axs[2].legend()
     axs[2].grid(True)
 
     plt.tight_layout()
-    plt.show()
+    if path is not None:
+        fig.savefig(path)
+    if show and plt.get_backend().lower() != "agg":
+        plt.show()
+    plt.close(fig)
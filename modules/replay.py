@@ -0,0 +1,155 @@
+import itertools
+import os
+import resource
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from domains import create_domains
+from membership import build_memberships
+from rules import build_rules, CompiledRuleBase
+from inference import move_batch
+
+# full precision for epoch timestamps, sensor precision for the rest
+CSV_FORMAT = ("%.17g", "%.6g", "%.6g", "%.6g")
+
+
+def _is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def iso_seconds(token):
+    # ISO-8601 timestamp -> epoch seconds; naive times are taken as UTC
+    t = datetime.fromisoformat(token.strip())
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return t.timestamp()
+
+
+def _timestamp_kind(token):
+    if _is_number(token):
+        return "numeric"
+    try:
+        iso_seconds(token)
+        return "iso"
+    except ValueError:
+        return None
+
+
+def _data_lines(f):
+    # the rows the parser reads: no blank or "#" lines, no header. Returns
+    # the timestamp kind of the first row and an iterator over all rows
+    lines = (line for line in f if line.strip() and not line.startswith("#"))
+    first = next(lines, None)
+    if first is None:
+        return "numeric", iter(())
+    kind = _timestamp_kind(first.split(",")[0])
+    if kind is not None:
+        return kind, itertools.chain([first], lines)
+
+    # first row was a header; the data below it must have usable timestamps
+    second = next(lines, None)
+    if second is None:
+        return "numeric", iter(())
+    kind = _timestamp_kind(second.split(",")[0])
+    if kind is None:
+        raise ValueError(
+            f"timestamp {second.split(',')[0]!r} is neither a number "
+            "nor an ISO-8601 date"
+        )
+    return kind, itertools.chain([second], lines)
+
+
+def iter_chunks(path, chunk_size=100000):
+    # yields (timestamp, height, distance) float arrays of at most chunk_size
+    # rows; ISO-8601 timestamps come out as epoch seconds
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        for i in range(0, data.shape[0], chunk_size):
+            block = np.asarray(data[i : i + chunk_size], dtype=float)
+            yield block[:, 0], block[:, 1], block[:, 2]
+        return
+
+    with open(path) as f:
+        kind, lines = _data_lines(f)
+        converters = {0: iso_seconds} if kind == "iso" else None
+        while True:
+            batch = list(itertools.islice(lines, chunk_size))
+            if not batch:
+                break
+            block = np.loadtxt(
+                batch,
+                delimiter=",",
+                ndmin=2,
+                usecols=(0, 1, 2),
+                converters=converters,
+            )
+            yield block[:, 0], block[:, 1], block[:, 2]
+
+
+def _count_rows(path):
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r").shape[0]
+    with open(path) as f:
+        return sum(1 for _ in _data_lines(f)[1])
+
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if os.uname().sysname == "Darwin" else rss / 1024
+
+
+def replay_log(
+    in_path, out_path, chunk_size=100000, reducer="bmm", surface=None, resolution=300
+):
+    domains = create_domains(resolution)
+    mf = build_memberships(domains, lazy_inputs=True)
+    crb = CompiledRuleBase(build_rules(), mf)
+
+    if out_path.endswith(".npy"):
+        out = np.lib.format.open_memmap(
+            out_path, mode="w+", dtype=float, shape=(_count_rows(in_path), 4)
+        )
+    else:
+        out = open(out_path, "w")
+        out.write("timestamp,height,distance,move\n")
+
+    rows = 0
+    t0 = time.perf_counter()
+    try:
+        for ts, h, d in iter_chunks(in_path, chunk_size):
+            if surface is not None:
+                moves = surface.query(h, d)
+            else:
+                moves = move_batch(h, d, domains, mf, crb, reducer)
+            block = np.column_stack((ts, h, d, moves))
+            if isinstance(out, np.ndarray):
+                out[rows : rows + len(block)] = block
+            else:
+                np.savetxt(out, block, delimiter=",", fmt=CSV_FORMAT)
+            rows += len(block)
+    finally:
+        if isinstance(out, np.ndarray):
+            out.flush()
+        else:
+            out.close()
+
+    elapsed = time.perf_counter() - t0
+    report = {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(
+        f"\n=== REPLAY {in_path} → {out_path} ===\n"
+        f"Baris: {rows} | {report['rows_per_sec']:.0f} baris/detik | "
+        f"Puncak RSS: {report['peak_rss_mb']:.1f} MB"
+    )
+    return report
@@ -1,3 +1,7 @@
+import numpy as np
+from membership import GaussianT2
+
+
 def build_rules():
     return [
         ("semai", "sangat_jauh", "turun_banyak"),
@@ -21,3 +25,129 @@ def build_rules():
         ("produktif", "dekat", "naik_sedikit"),
         ("produktif", "sangat_dekat", "naik_banyak"),
     ]
+
+
+class CompiledRuleBase:
+    def __init__(self, rules, mf):
+        self.height_sets = list(mf["height"])
+        self.distance_sets = list(mf["distance"])
+        self.output_sets = list(mf["output"])
+        self.rules = [tuple(r) for r in rules]
+        self._validate()
+
+        hi = {k: i for i, k in enumerate(self.height_sets)}
+        di = {k: i for i, k in enumerate(self.distance_sets)}
+        oi = {k: i for i, k in enumerate(self.output_sets)}
+        self.h_idx = np.array([hi[h] for h, _, _ in self.rules], dtype=np.intp)
+        self.d_idx = np.array([di[d] for _, d, _ in self.rules], dtype=np.intp)
+        self.o_idx = np.array([oi[o] for _, _, o in self.rules], dtype=np.intp)
+
+        outputs = [mf["output"][k] for k in self.output_sets]
+        if all(isinstance(o, GaussianT2) for o in outputs):
+            # parametric consequents, used by the analytic defuzzifier
+            self.output_params = np.array([o.params() for o in outputs], dtype=float)
+            self.outputs = None
+        else:
+            # (n_outputs, 2, n_points): upper and lower MF of every consequent
+            self.output_params = None
+            self.outputs = np.ascontiguousarray(
+                np.stack([np.stack(o) for o in outputs])
+            )
+
+        self._index()
+
+    @classmethod
+    def from_arrays(
+        cls, sets, h_idx, d_idx, o_idx, outputs=None, output_params=None, rule_at=None
+    ):
+        # rebuild from stored index arrays (e.g. a mapped artifact): the arrays
+        # are used as given, set names only label the rules
+        self = cls.__new__(cls)
+        self.height_sets = list(sets["height"])
+        self.distance_sets = list(sets["distance"])
+        self.output_sets = list(sets["output"])
+        for name, idx, n in (
+            ("height", h_idx, len(self.height_sets)),
+            ("distance", d_idx, len(self.distance_sets)),
+            ("output", o_idx, len(self.output_sets)),
+        ):
+            if idx.size and (idx.min() < 0 or idx.max() >= n):
+                raise ValueError(f"{name} rule index out of range for {n} sets")
+        self.h_idx, self.d_idx, self.o_idx = h_idx, d_idx, o_idx
+        self.rules = [
+            (self.height_sets[h], self.distance_sets[d], self.output_sets[o])
+            for h, d, o in zip(h_idx.tolist(), d_idx.tolist(), o_idx.tolist())
+        ]
+        self._validate()
+        if (outputs is None) == (output_params is None):
+            raise ValueError("Give exactly one of outputs and output_params")
+        self.outputs, self.output_params = outputs, output_params
+        self._index(rule_at)
+        return self
+
+    def _index(self, rule_at=None):
+        # activation index: rule id for every (height set, distance set) pair
+        expected = np.full(
+            (len(self.height_sets), len(self.distance_sets)), -1, dtype=np.intp
+        )
+        expected[self.h_idx, self.d_idx] = np.arange(len(self.rules))
+        if rule_at is not None and not np.array_equal(rule_at, expected):
+            raise ValueError("rule_at does not match the rule index arrays")
+        self.rule_at = expected if rule_at is None else rule_at
+        self.rules_by_output = [
+            np.flatnonzero(self.o_idx == k) for k in range(len(self.output_sets))
+        ]
+
+    def _validate(self):
+        seen = {}
+        for rule in self.rules:
+            if len(rule) != 3:
+                raise ValueError(f"Rule must be (height, distance, output): {rule!r}")
+            h, d, o = rule
+            if h not in self.height_sets:
+                raise ValueError(f"Unknown height set {h!r} in rule {rule!r}")
+            if d not in self.distance_sets:
+                raise ValueError(f"Unknown distance set {d!r} in rule {rule!r}")
+            if o not in self.output_sets:
+                raise ValueError(f"Unknown output set {o!r} in rule {rule!r}")
+            if (h, d) in seen:
+                raise ValueError(
+                    f"Duplicate antecedent ({h!r}, {d!r}): "
+                    f"{seen[(h, d)]!r} and {o!r}"
+                )
+            seen[(h, d)] = o
+
+    def __len__(self):
+        return len(self.rules)
+
+    def strengths(self, mu_h, mu_d):
+        return np.fmin(mu_h[:, self.h_idx], mu_d[:, self.d_idx])
+
+    def output_strengths(self, strength):
+        # rules sharing a consequent collapse to their max before clipping
+        out = np.zeros((strength.shape[0], len(self.output_sets)), dtype=strength.dtype)
+        for k, idx in enumerate(self.rules_by_output):
+            if idx.size:
+                out[:, k] = strength[:, idx].max(axis=1)
+        return out
+
+    def aggregate(self, strength):
+        out = self.output_strengths(strength)
+        clipped = np.fmin(out[:, :, None, None], self.outputs[None])
+        return clipped.max(axis=1)
+
+    def active_rules(self, mu_h, mu_d, eps=1e-6):
+        hs = np.flatnonzero(mu_h > eps)
+        ds = np.flatnonzero(mu_d > eps)
+        candidates = self.rule_at[np.ix_(hs, ds)].ravel()
+        candidates = candidates[candidates >= 0]
+
+        strength = np.fmin(mu_h[self.h_idx[candidates]], mu_d[self.d_idx[candidates]])
+        keep = strength > eps
+        return candidates[keep], strength[keep]
+
+
+def compile_rules(rules, mf):
+    if isinstance(rules, CompiledRuleBase):
+        return rules
+    return CompiledRuleBase(rules, mf)
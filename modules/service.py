@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+from asyncio import FIRST_COMPLETED
+import csv
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from domains import create_domains
+from membership import build_memberships
+from rules import build_rules, CompiledRuleBase
+from inference import infer_batch
+
+
+class ReadingQueue:
+    def __init__(self, maxsize=10000, policy="block"):
+        if policy not in ("block", "drop_oldest"):
+            raise ValueError(f"Unknown queue policy: {policy!r}")
+        self.queue = asyncio.Queue(maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    async def put(self, reading):
+        if self.policy == "block":
+            # producer waits for room: backpressure up to the source
+            await self.queue.put(reading)
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(reading)
+
+    def drain(self, limit):
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    def qsize(self):
+        return self.queue.qsize()
+
+
+class LatencyStats:
+    def __init__(self, window=100000):
+        self.samples = deque(maxlen=window)
+        self.overruns = 0
+        self.readings = 0
+
+    def record(self, seconds, n, budget):
+        self.samples.append(seconds)
+        self.readings += n
+        if seconds > budget:
+            self.overruns += 1
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        return float(np.percentile(self.samples, q))
+
+    def report(self):
+        return {
+            "ticks": len(self.samples),
+            "readings": self.readings,
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "overruns": self.overruns,
+        }
+
+
+def make_move_fn(surface=None, reducer="bmm"):
+    if surface is not None:
+        return surface.query
+
+    domains = create_domains()
+    mf = build_memberships(domains, lazy_inputs=True)
+    crb = CompiledRuleBase(build_rules(), mf)
+
+    def move(heights, distances):
+        return infer_batch(heights, distances, domains, mf, crb, reducer)[2]
+
+    return move
+
+
+def _parse(row):
+    lamp, height, distance = row[:3]
+    return lamp, float(height), float(distance)
+
+
+async def csv_source(path, queue, rate=None):
+    # rate: rows per second to replay at, None replays as fast as possible
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        for i, row in enumerate(reader):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                reading = _parse(row)
+            except ValueError:
+                continue  # header or malformed row
+            await queue.put(reading)
+            if rate:
+                await asyncio.sleep(1 / rate)
+            elif i % 1000 == 0:
+                await asyncio.sleep(0)
+
+
+async def socket_source(host, port, queue):
+    async def handle(reader, writer):
+        while line := await reader.readline():
+            try:
+                await queue.put(_parse(line.decode().strip().split(",")))
+            except ValueError:
+                continue
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def synthetic_source(queue, n_lamps=1000, rate=20.0, seed=0):
+    # every lamp reports `rate` times per second with a drifting distance
+    rng = np.random.default_rng(seed)
+    heights = rng.uniform(0, 110, n_lamps)
+    distances = rng.uniform(0, 100, n_lamps)
+    while True:
+        distances = np.clip(distances + rng.normal(0, 0.3, n_lamps), 0, 100)
+        for lamp in range(n_lamps):
+            await queue.put((lamp, heights[lamp], distances[lamp]))
+        await asyncio.sleep(1 / rate)
+
+
+def stdout_sink(lamps, moves):
+    sys.stdout.writelines(f"{l},{m:.3f}\n" for l, m in zip(lamps, moves))
+
+
+async def controller_loop(
+    queue, move_fn, sink, stats, tick=0.05, budget=0.02, max_batch=4096
+):
+    # per-reading cost of move_fn (smoothed), used to size each batch so one
+    # inference call fits in what is left of the tick's budget
+    per_reading = None
+    while True:
+        start = time.perf_counter()
+        deadline = start + budget
+        n = 0
+
+        # drain in chunks until the queue is empty or the budget is spent;
+        # whatever is left waits for the next tick
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining < 0.2 * budget:
+                # small tail batches are mostly per-call overhead
+                break
+            if per_reading is None:
+                size = min(max_batch, 256)
+            else:
+                size = min(max_batch, int(0.7 * remaining / per_reading))
+            if size < 1:
+                break
+            batch = queue.drain(size)
+            if not batch:
+                break
+            t0 = time.perf_counter()
+            latest = {lamp: (h, d) for lamp, h, d in batch}
+            lamps = list(latest)
+            h, d = np.array(list(latest.values())).T
+            sink(lamps, move_fn(h, d))
+            cost = (time.perf_counter() - t0) / len(batch)
+            per_reading = (
+                cost if per_reading is None else 0.7 * per_reading + 0.3 * cost
+            )
+            n += len(batch)
+
+        elapsed = time.perf_counter() - start
+        if n:
+            stats.record(elapsed, n, budget)
+        await asyncio.sleep(max(tick - elapsed, 0))
+
+
+async def run_service(
+    source,
+    move_fn,
+    sink=stdout_sink,
+    queue_size=10000,
+    policy="block",
+    tick=0.05,
+    budget=0.02,
+    duration=None,
+):
+    queue = ReadingQueue(queue_size, policy)
+    stats = LatencyStats()
+
+    producer = asyncio.create_task(source(queue))
+    consumer = asyncio.create_task(
+        controller_loop(queue, move_fn, sink, stats, tick, budget)
+    )
+    loop = asyncio.get_running_loop()
+    end = None if duration is None else loop.time() + duration
+    try:
+        # the consumer only ever stops by failing; returning on the first
+        # finished task keeps a dead consumer from leaving a blocked producer
+        done, _ = await asyncio.wait(
+            {producer, consumer}, timeout=duration, return_when=FIRST_COMPLETED
+        )
+        if producer in done and consumer not in done and not producer.exception():
+            # a finite source ran dry: let the controller finish what is
+            # queued, within whatever is left of the duration
+            while queue.qsize() and not consumer.done():
+                left = tick if end is None else min(tick, end - loop.time())
+                if left <= 0:
+                    break
+                await asyncio.wait({consumer}, timeout=left)
+    finally:
+        producer.cancel()
+        consumer.cancel()
+        await asyncio.gather(producer, consumer, return_exceptions=True)
+
+    for task in (consumer, producer):
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+
+    report = stats.report()
+    # readings still queued when the service stopped were never acted on
+    report["dropped"] = queue.dropped + queue.qsize()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan kontrol lampu (asyncio)")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", help="replay CSV lamp_id,height,distance")
+    src.add_argument("--port", type=int, help="baca dari socket TCP lokal")
+    src.add_argument("--synthetic", type=int, metavar="N_LAMPS")
+    parser.add_argument("--rate", type=float, default=None)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("--tick-ms", type=float, default=50)
+    parser.add_argument("--budget-ms", type=float, default=20)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--policy", choices=["block", "drop_oldest"], default="block")
+    parser.add_argument("--quiet", action="store_true", help="jangan cetak perintah")
+    args = parser.parse_args(argv)
+
+    if args.csv:
+        source = lambda q: csv_source(args.csv, q, args.rate)
+    elif args.port:
+        source = lambda q: socket_source("127.0.0.1", args.port, q)
+    else:
+        source = lambda q: synthetic_source(q, args.synthetic, args.rate or 20.0)
+
+    report = asyncio.run(
+        run_service(
+            source,
+            make_move_fn(),
+            sink=(lambda lamps, moves: None) if args.quiet else stdout_sink,
+            queue_size=args.queue_size,
+            policy=args.policy,
+            tick=args.tick_ms / 1000,
+            budget=args.budget_ms / 1000,
+            duration=args.duration,
+        )
+    )
+
+    print("\n=== LATENSI TICK ===", file=sys.stderr)
+    for k, v in report.items():
+        print(f"{k}: {v:.3f}" if isinstance(v, float) else f"{k}: {v}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
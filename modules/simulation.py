@@ -1,24 +1,85 @@
-from inference import infer
-from defuzzification import defuzz
+from inference import fuzzify_inputs, aggregate
+from instrumentation import null_stage
+from type_reduction import get_reducer
+from fleet import UNDECIDED, CONVERGED, OSCILLATING, DIVERGING, STATUS_NAMES, reverses
 
 
 def simulate(
-    domains, mf, rules, plant_height, lamp_distance, max_epoch=50, stable_th=1
+    domains,
+    mf,
+    rules,
+    plant_height,
+    lamp_distance,
+    max_epoch=50,
+    stable_th=1,
+    surface=None,
+    reducer="bmm",
+    instr=None,
+    telemetry=None,
+    lane=0,
+    max_period=8,
+    cycle_tol=1e-3,
+    bounds=None,
 ):
     xo = domains["output"]
+    reduce = get_reducer(reducer)
+    stage = instr.stage if instr is not None else null_stage
     pos = lamp_distance
+    lo, hi = bounds or (domains["distance"][0], domains["distance"][-1])
+    visited = [pos]
+    status = UNDECIDED
 
     print("\n=== SIMULASI CLOSED LOOP ===")
 
     for i in range(max_epoch):
-        agg_u, agg_l = infer(plant_height, pos, domains, mf, rules)
-        move = defuzz(xo, agg_u, agg_l)
+        if surface is not None:
+            with stage("surface"):
+                move = surface(plant_height, pos)
+        else:
+            with stage("fuzzify"):
+                μh, μd = fuzzify_inputs(plant_height, pos, domains, mf)
+            with stage("aggregate"):
+                agg_u, agg_l = aggregate(μh, μd, domains, mf, rules)
+            with stage("defuzz"):
+                move = float(reduce(xo, agg_u, agg_l))
         new_pos = pos + move
 
         print(f"Epoch {i+1:02d} | Pos: {pos:.2f} | Move: {move:.2f}")
+        if telemetry is not None:
+            telemetry.append(i + 1, pos, move, new_pos, abs(move), lane)
 
         if abs(move) < stable_th:
             print("✅ Sistem stabil")
+            status = CONVERGED
             break
 
         pos = new_pos
+
+        if not lo <= pos <= hi:
+            print("⚠️ Lampu keluar domain, sistem divergen")
+            status = DIVERGING
+            break
+        # back within cycle_tol of a position k epochs ago, having moved both
+        # ways since: a slow monotone creep is not a cycle
+        period = next(
+            (
+                k
+                for k in range(2, min(max_period, len(visited)) + 1)
+                if abs(pos - visited[-k]) <= cycle_tol
+                and reverses(visited[-k:] + [pos])
+            ),
+            None,
+        )
+        if period:
+            print(f"🔁 Lampu berosilasi (periode {period}), simulasi dihentikan")
+            status = OSCILLATING
+            break
+        visited.append(pos)
+    else:
+        print("⚠️ Maksimum epoch tercapai, sistem belum stabil")
+
+    if instr is not None and instr.enabled:
+        print("\n=== STATISTIK PER TAHAP ===")
+        print(instr.summary())
+
+    return STATUS_NAMES[status]
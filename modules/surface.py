@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+
+from inference import infer_batch
+from memo import fingerprint
+
+
+class ControlSurface:
+    def __init__(self, table, height_range, distance_range, meta=None):
+        self.table = table
+        # controller the table was sampled from: {"fingerprint", "reducer"}
+        self.meta = meta
+        self.h0, self.h1 = height_range
+        self.d0, self.d1 = distance_range
+        self.nh, self.nd = table.shape
+        self.sh = (self.nh - 1) / (self.h1 - self.h0)
+        self.sd = (self.nd - 1) / (self.d1 - self.d0)
+
+    @classmethod
+    def build(
+        cls,
+        domains,
+        mf,
+        rules,
+        n_height=221,
+        n_distance=201,
+        chunk=2000,
+        reducer="bmm",
+    ):
+        xh, xd = domains["height"], domains["distance"]
+        gh = np.linspace(xh[0], xh[-1], n_height)
+        gd = np.linspace(xd[0], xd[-1], n_distance)
+        H, D = np.meshgrid(gh, gd, indexing="ij")
+        H, D = H.ravel(), D.ravel()
+
+        table = np.empty(H.size)
+        for i in range(0, H.size, chunk):
+            table[i : i + chunk] = infer_batch(
+                H[i : i + chunk], D[i : i + chunk], domains, mf, rules, reducer
+            )[2]
+
+        return cls(
+            table.reshape(n_height, n_distance),
+            (xh[0], xh[-1]),
+            (xd[0], xd[-1]),
+            {"fingerprint": surface_fingerprint(mf, rules), "reducer": reducer},
+        )
+
+    def save(self, path):
+        # the table stays a raw .npy so load() can map it; what it was built
+        # from goes to a <path>.json sidecar, written last
+        meta = {
+            **(self.meta or {}),
+            "height_range": [float(self.h0), float(self.h1)],
+            "distance_range": [float(self.d0), float(self.d1)],
+        }
+        with open(path, "wb") as f:
+            np.save(f, self.table)
+        with open(path + ".json.tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(path + ".json.tmp", path + ".json")
+
+    @classmethod
+    def load(cls, path, domains=None, mf=None, rules=None, reducer=None):
+        # every argument given is checked against what the file was built with
+        if not os.path.exists(path + ".json"):
+            raise ValueError(f"{path} has no {path}.json metadata, rebuild it")
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        h_range, d_range = tuple(meta["height_range"]), tuple(meta["distance_range"])
+        if domains is not None:
+            xh, xd = domains["height"], domains["distance"]
+            if not np.allclose(h_range + d_range, (xh[0], xh[-1], xd[0], xd[-1])):
+                raise ValueError(
+                    f"{path} covers height {h_range} and distance {d_range}, "
+                    "not the current domains"
+                )
+        if mf is not None and meta["fingerprint"] != surface_fingerprint(mf, rules):
+            raise ValueError(f"{path} was built from a different controller")
+        if reducer is not None and meta["reducer"] != reducer:
+            raise ValueError(
+                f"{path} was built with reducer {meta['reducer']!r}, not {reducer!r}"
+            )
+        table = np.load(path, mmap_mode="r")
+        meta = {"fingerprint": meta["fingerprint"], "reducer": meta["reducer"]}
+        return cls(table, h_range, d_range, meta)
+
+    def __call__(self, plant_height, lamp_distance):
+        fh = (min(max(plant_height, self.h0), self.h1) - self.h0) * self.sh
+        fd = (min(max(lamp_distance, self.d0), self.d1) - self.d0) * self.sd
+        i = min(int(fh), self.nh - 2)
+        j = min(int(fd), self.nd - 2)
+        th = fh - i
+        td = fd - j
+
+        t = self.table
+        top = t[i, j] * (1 - td) + t[i, j + 1] * td
+        bottom = t[i + 1, j] * (1 - td) + t[i + 1, j + 1] * td
+        return float(top * (1 - th) + bottom * th)
+
+    def query(self, heights, distances):
+        heights, distances = np.broadcast_arrays(
+            np.asarray(heights, dtype=float), np.asarray(distances, dtype=float)
+        )
+        fh = (np.clip(heights, self.h0, self.h1) - self.h0) * self.sh
+        fd = (np.clip(distances, self.d0, self.d1) - self.d0) * self.sd
+        i = np.minimum(fh.astype(int), self.nh - 2)
+        j = np.minimum(fd.astype(int), self.nd - 2)
+        th = fh - i
+        td = fd - j
+
+        t = self.table
+        top = t[i, j] * (1 - td) + t[i, j + 1] * td
+        bottom = t[i + 1, j] * (1 - td) + t[i + 1, j + 1] * td
+        return top * (1 - th) + bottom * th
+
+
+def surface_fingerprint(mf, rules):
+    # memo.fingerprint over the memberships the table was sampled from
+    return fingerprint(mf, getattr(rules, "rules", rules))
+
+
+def surface_error(surface, domains, mf, rules, n=2000, seed=0, reducer="bmm"):
+    xh, xd = domains["height"], domains["distance"]
+    rng = np.random.default_rng(seed)
+    h = rng.uniform(xh[0], xh[-1], n)
+    d = rng.uniform(xd[0], xd[-1], n)
+
+    exact = infer_batch(h, d, domains, mf, rules, reducer)[2]
+    err = np.abs(surface.query(h, d) - exact)
+
+    print("\n=== ERROR CONTROL SURFACE ===")
+    print(f"Grid: {surface.nh}x{surface.nd} | Sampel: {n}")
+    print(f"Max error: {err.max():.4f} cm | Mean error: {err.mean():.4f} cm")
+    return err.max()
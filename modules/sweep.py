@@ -0,0 +1,224 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+
+from artifact import artifact_controller, build_artifact, load_artifact
+from fleet import simulate_fleet, status_counts
+
+_controller = None
+
+
+def _worker_controller(artifact, sha256):
+    # every worker maps the same artifact file: one physical copy of the
+    # controller tensors in the page cache, no per-process rebuild
+    global _controller
+    if _controller is None or _controller[0] != (artifact, sha256):
+        art = artifact_controller(artifact)
+        if art["manifest"]["sha256"] != sha256:
+            raise ValueError(f"{artifact} changed since the sweep started")
+        _controller = ((artifact, sha256), art["domains"], art["mf"], art["rules"])
+    return _controller[1:]
+
+
+def _grid(params):
+    H, D = np.meshgrid(params["heights"], params["distances"], indexing="ij")
+    return H.ravel(), D.ravel()
+
+
+def _run_shard(params, shard, path, artifact):
+    domains, mf, crb = _worker_controller(artifact, params["controller"]["sha256"])
+    H, D = _grid(params)
+    h = H[shard["start"] : shard["stop"]]
+    d = D[shard["start"] : shard["stop"]]
+
+    res = simulate_fleet(
+        domains,
+        mf,
+        crb,
+        h,
+        d,
+        max_epoch=shard["max_epoch"],
+        stable_th=shard["stable_th"],
+        reducer=params["reducer"],
+    )
+
+    # write-then-rename so an interrupted worker never leaves a partial shard
+    tmp = path + ".tmp.npz"
+    np.savez(
+        tmp,
+        heights=h,
+        distances=d,
+        epochs=res["epochs"],
+        converged=res["converged"],
+        status=res["status"],
+        period=res["period"],
+        final=res["final"],
+    )
+    os.replace(tmp, path)
+    return shard["id"]
+
+
+def _plan(params, chunk_size):
+    n = len(params["heights"]) * len(params["distances"])
+    shards = []
+    combos = product(params["max_epochs"], params["stable_ths"])
+    for combo, (max_epoch, stable_th) in enumerate(combos):
+        for start in range(0, n, chunk_size):
+            shards.append(
+                {
+                    "id": len(shards),
+                    "combo": combo,
+                    "max_epoch": max_epoch,
+                    "stable_th": stable_th,
+                    "start": start,
+                    "stop": min(start + chunk_size, n),
+                    "file": f"shard_{len(shards):05d}.npz",
+                    "done": False,
+                }
+            )
+    return shards
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _load_manifest(out_dir):
+    path = os.path.join(out_dir, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_sweep(
+    out_dir,
+    heights,
+    distances,
+    max_epochs=(50,),
+    stable_ths=(1,),
+    chunk_size=5000,
+    workers=None,
+    reducer="bmm",
+    artifact=None,
+):
+    os.makedirs(out_dir, exist_ok=True)
+    if artifact is None:
+        artifact = os.path.join(out_dir, "controller.fzl")
+        if not os.path.exists(artifact):
+            build_artifact(artifact, reducer=reducer)
+
+    # the controller is part of the sweep's identity: a resumed sweep must
+    # run the exact artifact, and reducer, its first shards ran with
+    controller, _ = load_artifact(artifact)
+    if controller["reducer"] != reducer:
+        raise ValueError(
+            f"{artifact} was compiled for reducer {controller['reducer']!r}, "
+            f"not {reducer!r}"
+        )
+    params = {
+        "heights": [float(v) for v in heights],
+        "distances": [float(v) for v in distances],
+        "max_epochs": [int(v) for v in max_epochs],
+        "stable_ths": [float(v) for v in stable_ths],
+        "reducer": reducer,
+        "controller": {
+            "sha256": controller["sha256"],
+            "fingerprint": controller["fingerprint"],
+        },
+    }
+
+    manifest = _load_manifest(out_dir)
+    if manifest is None:
+        manifest = {"params": params, "shards": _plan(params, chunk_size)}
+        _write_manifest(out_dir, manifest)
+    elif manifest["params"].get("controller") != params["controller"]:
+        raise ValueError(f"{out_dir} holds a sweep run with a different controller")
+    elif manifest["params"] != params:
+        raise ValueError(f"{out_dir} holds a sweep with different parameters")
+
+    shards = manifest["shards"]
+    todo = [
+        s
+        for s in shards
+        if not (s["done"] and os.path.exists(os.path.join(out_dir, s["file"])))
+    ]
+    print(f"\n=== SWEEP: {len(shards) - len(todo)}/{len(shards)} shard selesai ===")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _run_shard, params, s, os.path.join(out_dir, s["file"]), artifact
+            )
+            for s in todo
+        ]
+        for fut in as_completed(futures):
+            shards[fut.result()]["done"] = True
+            _write_manifest(out_dir, manifest)
+
+    return summarize(out_dir)
+
+
+def summarize(out_dir, bins=20):
+    manifest = _load_manifest(out_dir)
+    params = manifest["params"]
+    lo, hi = min(params["distances"]), max(params["distances"])
+    combos = list(product(params["max_epochs"], params["stable_ths"]))
+
+    summary = []
+    for c, (max_epoch, stable_th) in enumerate(combos):
+        files = [
+            os.path.join(out_dir, s["file"])
+            for s in manifest["shards"]
+            if s["combo"] == c and s["done"]
+        ]
+        if not files:
+            continue
+        names = ("converged", "epochs", "final", "status")
+        parts = []
+        for f in files:
+            # NpzFile keeps the zip open until closed
+            with np.load(f) as p:
+                parts.append([p[name] for name in names])
+        converged, epochs, final, status = (np.concatenate(c) for c in zip(*parts))
+
+        counts, edges = np.histogram(
+            final, bins=bins, range=(min(lo, final.min()), max(hi, final.max()))
+        )
+        row = {
+            "max_epoch": max_epoch,
+            "stable_th": stable_th,
+            "lanes": int(converged.size),
+            "convergence_rate": float(converged.mean()),
+            "mean_epochs": float(epochs[converged].mean()) if converged.any() else None,
+            "status": status_counts(status),
+            "final_hist": counts.tolist(),
+            "final_edges": edges.tolist(),
+        }
+        summary.append(row)
+
+        mean_epochs = row["mean_epochs"] if converged.any() else float("nan")
+        print(
+            f"max_epoch={max_epoch:3d} | stable_th={stable_th:<5g} | "
+            f"lane: {row['lanes']} | konvergen: {row['convergence_rate']:.1%} | "
+            f"epoch rata-rata: {mean_epochs:.2f} | osilasi: "
+            f"{row['status']['oscillating']} | divergen: {row['status']['diverging']}"
+        )
+
+    return summary
+
+
+if __name__ == "__main__":
+    run_sweep(
+        "sweep_output",
+        np.linspace(0, 110, 111),
+        np.linspace(0, 100, 101),
+        max_epochs=(20, 50),
+        stable_ths=(0.1, 1),
+    )
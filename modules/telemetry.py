@@ -0,0 +1,172 @@
+import time
+
+import numpy as np
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("epoch", "<i4"),
+        ("lane", "<i4"),
+        ("distance", "<f8"),
+        ("move", "<f8"),
+        ("new_distance", "<f8"),
+        ("delta", "<f8"),
+    ]
+)
+
+MAGIC = 0x314D4C4554544C46  # "FLTTELM1"
+HEADER_WORDS = 8  # magic, capacity, count, record size, claimed, rest reserved
+HEADER_BYTES = HEADER_WORDS * 8
+_CAPACITY, _COUNT, _CLAIMED = 1, 2, 4
+
+# once the ring wraps, appends overwrite the oldest records in place. A writer
+# publishes the count it is about to reach (claimed) before touching a slot
+# and the count itself after, so every record older than claimed - capacity
+# may be torn. Readers copy only what they need, re-read claimed and drop the
+# records it has since passed
+
+
+class TelemetryStore:
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.header = np.memmap(path, dtype="<i8", mode=mode, shape=(HEADER_WORDS,))
+        if self.header[0] != MAGIC or self.header[3] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a telemetry store")
+        self.capacity = int(self.header[_CAPACITY])
+        self.records = np.memmap(
+            path,
+            dtype=RECORD_DTYPE,
+            mode=mode,
+            offset=HEADER_BYTES,
+            shape=(self.capacity,),
+        )
+
+    @classmethod
+    def create(cls, path, capacity=1_000_000):
+        header = np.memmap(
+            path,
+            dtype="<i8",
+            mode="w+",
+            shape=(HEADER_WORDS + capacity * RECORD_DTYPE.itemsize // 8,),
+        )
+        header[:HEADER_WORDS] = [MAGIC, capacity, 0, RECORD_DTYPE.itemsize, 0, 0, 0, 0]
+        header.flush()
+        del header
+        return cls(path, mode="r+")
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        return cls(path, mode)
+
+    @property
+    def count(self):
+        # total records ever appended; the ring keeps the last `capacity`
+        return int(self.header[_COUNT])
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _claimed(self):
+        return max(int(self.header[_CLAIMED]), self.count)
+
+    def _begin(self, count):
+        self.header[_CLAIMED] = count
+
+    def _end(self, count):
+        self.header[_COUNT] = count
+
+    def append(self, epoch, distance, move, new_distance, delta, lane=0):
+        n = self.count
+        self._begin(n + 1)
+        self.records[n % self.capacity] = (
+            epoch,
+            lane,
+            distance,
+            move,
+            new_distance,
+            delta,
+        )
+        self._end(n + 1)
+
+    def append_batch(self, epoch, distance, move, new_distance, delta, lanes):
+        lanes = np.asarray(lanes)
+        k = lanes.size
+        cols = [np.broadcast_to(v, (k,)) for v in (distance, move, new_distance, delta)]
+        n = self.count
+        if k > self.capacity:
+            # only the newest `capacity` records would survive the wrap
+            skip = k - self.capacity
+            lanes, cols = lanes[skip:], [c[skip:] for c in cols]
+            n += skip
+            k = self.capacity
+
+        self._begin(n + k)
+        start = n % self.capacity
+        first = min(k, self.capacity - start)
+        for dst, src in (
+            (slice(start, start + first), slice(0, first)),
+            (slice(0, k - first), slice(first, k)),
+        ):
+            if dst.stop == dst.start:
+                continue
+            rec = self.records[dst]
+            rec["epoch"] = epoch
+            rec["lane"] = lanes[src]
+            for name, col in zip(("distance", "move", "new_distance", "delta"), cols):
+                rec[name] = col[src]
+        self._end(n + k)
+
+    def _segments(self, lo, hi):
+        # (first record number, zero-copy view) covering records [lo, hi)
+        i = lo % self.capacity
+        j = i + hi - lo
+        if j <= self.capacity:
+            return [(lo, self.records[i:j])]
+        return [
+            (lo, self.records[i:]),
+            (lo + self.capacity - i, self.records[: j - self.capacity]),
+        ]
+
+    def _window(self, n=None):
+        hi = self.count
+        lo = max(hi - self.capacity, self._claimed() - self.capacity, 0)
+        if n is not None:
+            lo = max(lo, hi - n)
+        return lo, hi
+
+    def views(self):
+        # zero-copy, oldest first: one slice before the ring wraps, two after.
+        # A concurrent writer may overwrite them; snapshot() copies safely
+        return tuple(v for _, v in self._segments(*self._window()))
+
+    def snapshot(self):
+        # the records still intact after the copy, oldest first
+        lo, hi = self._window()
+        data = np.concatenate([v for _, v in self._segments(lo, hi)])
+        safe = self._claimed() - self.capacity
+        return data[max(safe - lo, 0) :]
+
+    def latest(self, n, retries=100):
+        # copies only the last n slots; retried only if the writer lapped the
+        # reader during the copy
+        for _ in range(retries):
+            lo, hi = self._window(max(n, 0))
+            data = np.concatenate([v for _, v in self._segments(lo, hi)])
+            if self._claimed() - self.capacity <= lo:
+                return data
+            time.sleep(0)
+        raise RuntimeError(f"{self.path} was overwritten during {retries} reads")
+
+    def lane(self, lane):
+        # only the matching rows are copied, then checked like snapshot()
+        lo, hi = self._window()
+        index, rows = [], []
+        for start, view in self._segments(lo, hi):
+            hit = np.flatnonzero(view["lane"] == lane)
+            index.append(start + hit)
+            rows.append(view[hit])
+        index, rows = np.concatenate(index), np.concatenate(rows)
+        return rows[index >= self._claimed() - self.capacity]
+
+    def flush(self):
+        self.header.flush()
+        self.records.flush()
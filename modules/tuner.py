@@ -0,0 +1,300 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from domains import create_domains
+from membership import GaussianT2, build_parametric_memberships
+from rules import build_rules, CompiledRuleBase
+from montecarlo import settle_metrics
+
+DEFAULT_WEIGHTS = {"settle": 1.0, "overshoot": 0.5, "steady_error": 1.0}
+
+
+def encode(params, variables):
+    return np.array(
+        [v for var in variables for mf in params[var].values() for v in mf.params()],
+        dtype=float,
+    )
+
+
+def decode(x, variables, base=None):
+    params = {
+        var: dict(sets)
+        for var, sets in (base or build_parametric_memberships()).items()
+    }
+    x = iter(np.asarray(x, dtype=float).tolist())
+    for var in variables:
+        for name in params[var]:
+            params[var][name] = GaussianT2(next(x), next(x), next(x))
+    return params
+
+
+def bounds_for(domains, params, variables):
+    # means anywhere on the variable's domain, sigmas up to a quarter of it
+    lo, hi = [], []
+    for var in variables:
+        a, b = float(domains[var][0]), float(domains[var][-1])
+        for _ in params[var]:
+            lo += [a, 0.5, 0.5]
+            hi += [b, (b - a) / 4, (b - a) / 4]
+    return np.array(lo), np.array(hi)
+
+
+def stage_targets(params, rules):
+    # desired distance per stage: the mean of the distance sets its rules map
+    # to "diam", taken from the hand-picked parameters so tuning cannot move it
+    targets = {}
+    for h in params["height"]:
+        means = [
+            params["distance"][d].mean for hh, d, o in rules if hh == h and o == "diam"
+        ]
+        targets[h] = float(np.mean(means))
+    return targets
+
+
+def _repair(pop, lo, hi, n_sets):
+    # keep each variable's sets in order and lower sigma <= upper sigma, so a
+    # tuned "semai" is still the smallest plant and the FOU stays valid
+    np.clip(pop, lo, hi, out=pop)
+    offset = 0
+    for n in n_sets:
+        cols = slice(offset, offset + 3 * n)
+        block = pop[:, cols].reshape(len(pop), n, 3)
+        order = np.argsort(block[:, :, 0], axis=1)
+        block = np.take_along_axis(block, order[..., None], axis=1)
+        block[:, :, 1:] = np.sort(block[:, :, 1:], axis=2)[:, :, ::-1]
+        pop[:, cols] = block.reshape(len(pop), -1)
+        offset += 3 * n
+    return pop
+
+
+def _population_params(pop, variables, base, sizes):
+    # (P, n_sets, 3) parameter tensor per variable, tuned or fixed
+    out, offset = {}, 0
+    for var in ("height", "distance", "output"):
+        if var in variables:
+            n = sizes[var]
+            out[var] = pop[:, offset : offset + 3 * n].reshape(len(pop), n, 3)
+            offset += 3 * n
+        else:
+            fixed = np.array([mf.params() for mf in base[var].values()], dtype=float)
+            out[var] = np.broadcast_to(fixed, (len(pop),) + fixed.shape)
+    return out
+
+
+def _fuzzify(values, p):
+    # values (P, N), p (P, S, 3) -> (P, N, S), closed form like fuzzify_sets
+    z2 = -0.5 * (values[:, :, None] - p[:, None, :, 0]) ** 2
+    return (np.exp(z2 / p[:, None, :, 1] ** 2) + np.exp(z2 / p[:, None, :, 2] ** 2)) / 2
+
+
+def population_fitness(pop, setup):
+    # the whole (sub)population x scenario set is one batched simulation:
+    # lanes are (individual, scenario) pairs
+    P = len(pop)
+    crb, xo = setup["crb"], setup["xo"]
+    heights, start, target = setup["heights"], setup["start"], setup["target"]
+    max_epoch = setup["max_epoch"]
+    p = _population_params(pop, setup["variables"], setup["base"], setup["sizes"])
+
+    z = xo - p["output"][..., 0, None]
+    outputs = np.stack(
+        [
+            np.exp(-0.5 * (z / p["output"][..., 1, None]) ** 2),
+            np.exp(-0.5 * (z / p["output"][..., 2, None]) ** 2),
+        ],
+        axis=2,
+    )  # (P, n_out, 2, n_points)
+
+    N = heights.size
+    mu_h = _fuzzify(np.broadcast_to(heights, (P, N)), p["height"]).reshape(P * N, -1)
+    pos = np.broadcast_to(start, (P, N)).copy()
+    trajectory = np.empty((max_epoch + 1, P, N))
+    trajectory[0] = pos
+    applied = np.empty((max_epoch, P, N))
+
+    for i in range(max_epoch):
+        mu_d = _fuzzify(pos, p["distance"]).reshape(P * N, -1)
+        out = crb.output_strengths(crb.strengths(mu_h, mu_d)).reshape(P, N, -1)
+        agg = np.zeros((P, N, 2, xo.size))
+        for k in range(out.shape[2]):
+            np.fmax(
+                agg, np.fmin(out[:, :, k, None, None], outputs[:, None, k]), out=agg
+            )
+        area = agg.sum(axis=-1)
+        c = np.divide(agg @ xo, area, out=np.zeros_like(area), where=area > 0)
+        move = c.mean(axis=-1)
+        pos += move
+        applied[i] = move
+        trajectory[i + 1] = pos
+
+    m = settle_metrics(
+        trajectory.reshape(max_epoch + 1, P * N),
+        applied.reshape(max_epoch, P * N),
+        np.tile(target, P),
+        setup["band"],
+        setup["tail"],
+    )
+    settle = np.nan_to_num(m["settle"], nan=2 * max_epoch) / max_epoch
+    # overshoot: how far the lamp went past the target on the far side
+    side = np.sign(target - start)
+    overshoot = np.max(side * (trajectory - target), axis=0).clip(0).reshape(P * N)
+
+    w = setup["weights"]
+    cost = (
+        w["settle"] * settle
+        + w["overshoot"] * overshoot
+        + w["steady_error"] * m["steady_error"]
+    )
+    return cost.reshape(P, N).mean(axis=1)
+
+
+def _setup(variables, weights, start_distances, max_epoch, band, tail, resolution):
+    base = build_parametric_memberships()
+    rules = build_rules()
+    targets = stage_targets(base, rules)
+    H, D = np.meshgrid(
+        [mf.mean for mf in base["height"].values()], start_distances, indexing="ij"
+    )
+    T = np.repeat(list(targets.values()), len(start_distances))
+    return {
+        "variables": tuple(variables),
+        "base": base,
+        "sizes": {var: len(sets) for var, sets in base.items()},
+        "crb": CompiledRuleBase(rules, base),
+        "xo": create_domains(resolution)["output"],
+        "heights": H.ravel().astype(float),
+        "start": D.ravel().astype(float),
+        "target": T,
+        "max_epoch": max_epoch,
+        "band": band,
+        "tail": tail,
+        "weights": {**DEFAULT_WEIGHTS, **(weights or {})},
+    }
+
+
+_setup_cache = None
+
+
+def _worker_fitness(args):
+    global _setup_cache
+    key, pop = args
+    if _setup_cache is None or _setup_cache[0] != key:
+        _setup_cache = (key, _setup(*json.loads(key)))
+    return population_fitness(pop, _setup_cache[1])
+
+
+def _save_checkpoint(path, state):
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **state)
+    os.replace(tmp, path)
+
+
+def tune(
+    variables=("height", "distance", "output"),
+    pop_size=40,
+    generations=100,
+    F=0.7,
+    CR=0.9,
+    weights=None,
+    start_distances=(5, 20, 35, 50, 65, 80, 95),
+    max_epoch=30,
+    band=1.0,
+    tail=5,
+    resolution=300,
+    workers=None,
+    seed=0,
+    checkpoint=None,
+):
+    # differential evolution (rand/1/bin) over the MF parameters; every
+    # generation is scored in `workers` batched chunks
+    key = json.dumps(
+        [
+            list(variables),
+            weights,
+            list(start_distances),
+            max_epoch,
+            band,
+            tail,
+            resolution,
+        ]
+    )
+    setup = _setup(*json.loads(key))
+    base, sizes = setup["base"], setup["sizes"]
+    domains = create_domains(resolution)
+    lo, hi = bounds_for(domains, base, variables)
+    n_sets = [sizes[v] for v in variables]
+    x0 = encode(base, variables)
+
+    rng = np.random.default_rng(seed)
+    gen = 0
+    if checkpoint and os.path.exists(checkpoint):
+        with np.load(checkpoint) as state:
+            if str(state["key"]) != key:
+                raise ValueError(f"{checkpoint} holds a run with different settings")
+            pop, cost, gen = state["pop"], state["cost"], int(state["generation"])
+            rng.bit_generator.state = json.loads(str(state["rng"]))
+        print(f"\n=== TUNER: lanjut dari generasi {gen} ===")
+    else:
+        pop = _repair(rng.uniform(lo, hi, (pop_size, lo.size)), lo, hi, n_sets)
+        pop[0] = x0  # the hand-picked controller is in the first generation
+        cost = None
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def evaluate(pop):
+            chunks = np.array_split(pop, min(workers, len(pop)))
+            return np.concatenate(
+                list(pool.map(_worker_fitness, [(key, c) for c in chunks]))
+            )
+
+        if cost is None:
+            cost = evaluate(pop)
+            baseline = cost[0]
+        else:
+            baseline = evaluate(x0[None])[0]
+        print(f"Biaya kontroler awal: {baseline:.4f}")
+
+        P, dim = pop.shape
+        for gen in range(gen, generations):
+            # three distinct partners per individual, none equal to itself
+            r = np.argsort(rng.random((P, P - 1)), axis=1)[:, :3]
+            r += r >= np.arange(P)[:, None]
+            mutant = pop[r[:, 0]] + F * (pop[r[:, 1]] - pop[r[:, 2]])
+            cross = rng.random((P, dim)) < CR
+            cross[np.arange(P), rng.integers(0, dim, P)] = True
+            trial = _repair(np.where(cross, mutant, pop), lo, hi, n_sets)
+
+            trial_cost = evaluate(trial)
+            better = trial_cost <= cost
+            pop[better], cost[better] = trial[better], trial_cost[better]
+
+            best = int(np.argmin(cost))
+            print(f"Generasi {gen + 1:3d} | biaya terbaik: {cost[best]:.4f}")
+            if checkpoint:
+                _save_checkpoint(
+                    checkpoint,
+                    {
+                        "key": key,
+                        "pop": pop,
+                        "cost": cost,
+                        "generation": gen + 1,
+                        "rng": json.dumps(rng.bit_generator.state),
+                    },
+                )
+
+    best = int(np.argmin(cost))
+    return {
+        "params": decode(pop[best], variables, base),
+        "vector": pop[best].copy(),
+        "cost": float(cost[best]),
+        "baseline_cost": float(baseline),
+    }
+
+
+if __name__ == "__main__":
+    result = tune(generations=30, checkpoint="tuner_checkpoint.npz")
+    print(f"\nBiaya: {result['baseline_cost']:.4f} -> {result['cost']:.4f}")
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+def _centroid(x, mf):
+    s = mf.sum(axis=-1)
+    c = np.divide(mf @ x, s, out=np.zeros_like(s), where=s > 0)
+    return c
+
+
+def _prefix(v):
+    c = np.zeros(v.shape[:-1] + (v.shape[-1] + 1,))
+    np.cumsum(v, axis=-1, out=c[..., 1:])
+    return c
+
+
+def _switch_tables(x, upper, lower):
+    # prefix sums let any switch point k be evaluated with a gather
+    return {
+        "xu": _prefix(upper * x),
+        "xl": _prefix(lower * x),
+        "u": _prefix(upper),
+        "l": _prefix(lower),
+    }
+
+
+def _endpoint(x, t, k, left):
+    rows = np.arange(k.shape[0])
+    # left: points before the switch take the upper MF, right: the lower MF
+    a_in, a_out = ("xu", "xl") if left else ("xl", "xu")
+    b_in, b_out = ("u", "l") if left else ("l", "u")
+    a = t[a_in][rows, k] + t[a_out][:, -1] - t[a_out][rows, k]
+    b = t[b_in][rows, k] + t[b_out][:, -1] - t[b_out][rows, k]
+    return np.divide(a, b, out=np.zeros_like(a), where=b > 0)
+
+
+def _iterate(x, t, k, left, max_iter):
+    y = _endpoint(x, t, k, left)
+    iterations = np.ones(k.shape, dtype=int)
+    active = np.ones(k.shape, dtype=bool)
+
+    for _ in range(max_iter):
+        k_new = np.searchsorted(x, y, side="right")
+        active &= k_new != k
+        if not active.any():
+            break
+        k = np.where(active, k_new, k)
+        y = np.where(active, _endpoint(x, t, k, left), y)
+        iterations += active
+
+    return y, iterations
+
+
+def _as_batch(upper, lower):
+    return np.atleast_2d(upper), np.atleast_2d(lower), np.ndim(upper) == 1
+
+
+def _result(y, scalar):
+    return y[0] if scalar else y
+
+
+def km(x, upper, lower, max_iter=100, return_iterations=False):
+    upper, lower, scalar = _as_batch(upper, lower)
+    t = _switch_tables(x, upper, lower)
+    k0 = np.searchsorted(x, _centroid(x, (upper + lower) / 2), side="right")
+
+    yl, il = _iterate(x, t, k0, True, max_iter)
+    yr, ir = _iterate(x, t, k0, False, max_iter)
+    y = _result((yl + yr) / 2, scalar)
+
+    if return_iterations:
+        return y, _result(il, scalar), _result(ir, scalar)
+    return y
+
+
+def ekm(x, upper, lower, max_iter=100, return_iterations=False):
+    upper, lower, scalar = _as_batch(upper, lower)
+    t = _switch_tables(x, upper, lower)
+    n, p = upper.shape
+
+    kl = np.full(n, round(p / 2.4))
+    kr = np.full(n, round(p / 1.7))
+    yl, il = _iterate(x, t, kl, True, max_iter)
+    yr, ir = _iterate(x, t, kr, False, max_iter)
+    y = _result((yl + yr) / 2, scalar)
+
+    if return_iterations:
+        return y, _result(il, scalar), _result(ir, scalar)
+    return y
+
+
+def nie_tan(x, upper, lower):
+    return _centroid(x, upper + lower)
+
+
+def bmm(x, upper, lower, m=0.5, n=0.5):
+    return m * _centroid(x, lower) + n * _centroid(x, upper)
+
+
+REDUCERS = {
+    "km": km,
+    "ekm": ekm,
+    "nt": nie_tan,
+    "bmm": bmm,
+}
+
+
+def get_reducer(name):
+    if name not in REDUCERS:
+        raise ValueError(f"Unknown type reducer: {name!r} ({', '.join(REDUCERS)})")
+    return REDUCERS[name]